@@ -0,0 +1,29 @@
+"""Add composite indexes for product queries
+
+Revision ID: add_product_query_indexes
+Revises: add_products_fts
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'add_product_query_indexes'
+down_revision = 'add_products_fts'
+branch_labels = None
+depends_on = None
+
+# name -> columns; kept in step with Product.__table_args__
+INDEXES = {
+    'ix_products_shop_id_status': ['shop_id', 'status'],
+    'ix_products_model_status': ['model', 'status'],
+    'ix_products_status_price': ['status', 'price'],
+    'ix_products_condition_status': ['condition', 'status'],
+}
+
+def upgrade() -> None:
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'products', columns)
+
+def downgrade() -> None:
+    for name in reversed(list(INDEXES)):
+        op.drop_index(name, table_name='products')
@@ -0,0 +1,22 @@
+"""Add products.row_hash
+
+Revision ID: add_product_row_hash
+Revises: initial_migration
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'add_product_row_hash'
+down_revision = 'initial_migration'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Content hash of the Excel columns a product was last synced from
+    op.add_column('products', sa.Column('row_hash', sa.String(40)))
+
+def downgrade() -> None:
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('row_hash')
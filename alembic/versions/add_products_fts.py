@@ -0,0 +1,27 @@
+"""Add FTS5 search index over products
+
+Revision ID: add_products_fts
+Revises: add_product_row_hash
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+from src.database.fts import CREATE_FTS, DROP_FTS, trigram_supported
+
+revision = 'add_products_fts'
+down_revision = 'add_product_row_hash'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # FTS5 is SQLite-only; other databases keep using ILIKE search
+    if op.get_bind().dialect.name != 'sqlite' or not trigram_supported():
+        return
+    for statement in CREATE_FTS:
+        op.execute(statement)
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in DROP_FTS:
+        op.execute(statement)
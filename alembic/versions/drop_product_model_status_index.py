@@ -0,0 +1,20 @@
+"""Drop the unused (model, status) product index
+
+Revision ID: drop_product_model_status_index
+Revises: add_product_query_indexes
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'drop_product_model_status_index'
+down_revision = 'add_product_query_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # model: searches are substring (ILIKE/FTS) matches, which cannot use it
+    op.drop_index('ix_products_model_status', table_name='products')
+
+def downgrade() -> None:
+    op.create_index('ix_products_model_status', 'products', ['model', 'status'])
@@ -0,0 +1,26 @@
+"""Index lower(condition) for case-insensitive condition: searches
+
+Revision ID: lower_condition_status_index
+Revises: drop_product_model_status_index
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'lower_condition_status_index'
+down_revision = 'drop_product_model_status_index'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # condition: now compares lower(condition), which the plain column index cannot serve
+    op.drop_index('ix_products_condition_status', table_name='products')
+    op.create_index(
+        'ix_products_lower_condition_status', 'products',
+        [sa.text('lower(condition)'), 'status']
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_products_lower_condition_status', table_name='products')
+    op.create_index('ix_products_condition_status', 'products', ['condition', 'status'])
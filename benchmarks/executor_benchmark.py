@@ -0,0 +1,90 @@
+"""Event loop responsiveness while handlers do blocking pandas/openpyxl work.
+
+Runs stock updates (an Excel write each) and searches against a generated
+workbook, either inline in the coroutine or through the shared executor,
+while a heartbeat task measures how late the loop wakes it up.
+
+Usage: python -m benchmarks.executor_benchmark --rows 20000 --updates 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from src.utils.data_manager import DataManager
+from src.utils.executor import executor
+
+HEARTBEAT = 0.01
+MODELS = ['iPhone 13', 'iPhone 14 Pro', 'Galaxy S23', 'Pixel 8', 'Redmi Note 12', 'OnePlus 11']
+
+
+def make_workbook(path: str, rows: int):
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        'ID': np.arange(1, rows + 1),
+        'Model': rng.choice(MODELS, rows),
+        'RAM': rng.choice(['4GB', '6GB', '8GB', '12GB'], rows),
+        'Storage': rng.choice(['64GB', '128GB', '256GB', '512GB'], rows),
+        'Network': rng.choice(['4G', '5G'], rows),
+        'Color': rng.choice(['Black', 'Blue', 'White', 'Green'], rows),
+        'Price': rng.integers(100, 1500, rows).astype(float),
+        'Stock': rng.integers(0, 20, rows)
+    }).to_excel(path, index=False)
+
+
+async def heartbeat(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        expected = time.perf_counter() + HEARTBEAT
+        await asyncio.sleep(HEARTBEAT)
+        lags.append(time.perf_counter() - expected)
+
+
+async def run(manager: DataManager, offload: bool, updates: int, searches: int):
+    lags, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    await asyncio.sleep(HEARTBEAT * 2)
+
+    async def call(func, *args):
+        if offload:
+            return await executor.run_io(func, *args)
+        return func(*args)
+
+    started = time.perf_counter()
+    for i in range(updates):
+        await call(manager.update_stock, i + 1, i)
+        # A data change empties the search cache, so these are real searches
+        await asyncio.gather(*(call(manager.search_products, MODELS[j % len(MODELS)])
+                               for j in range(searches)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await beat
+    return elapsed, np.array(lags) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--updates', type=int, default=5)
+    parser.add_argument('--searches', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'products.xlsx')
+        make_workbook(path, args.rows)
+        manager = DataManager(path)
+
+        print(f"{args.rows} rows, {args.updates} stock updates x {args.searches} searches")
+        for label, offload in (('inline', False), ('executor', True)):
+            elapsed, lags = asyncio.run(run(manager, offload, args.updates, args.searches))
+            print(f"{label:<9} {elapsed:>6.2f}s  loop lag p50 {np.percentile(lags, 50):>7.1f}ms  "
+                  f"p99 {np.percentile(lags, 99):>7.1f}ms  max {lags.max():>7.1f}ms")
+
+    print(executor.stats()['io'])
+    executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""LIKE '%q%' scan vs. FTS5 trigram MATCH on the products table.
+
+Usage: python -m benchmarks.fts_benchmark --rows 1000000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import numpy as np
+from sqlalchemy import create_engine
+from src.database.models import Base
+from src.database.fts import CREATE_FTS, FTS_TABLE, match_expression
+
+QUERIES = ['iphone 13', 'pro max', '256gb', 's23 ultra', 'pixel']
+
+LIKE_SQL = """
+    SELECT id FROM products
+    WHERE lower(model) LIKE :q OR lower(ram) LIKE :q
+       OR lower(network) LIKE :q OR lower(storage) LIKE :q
+"""
+MATCH_SQL = f"""
+    SELECT products.id FROM products
+    JOIN {FTS_TABLE} ON {FTS_TABLE}.rowid = products.id
+    WHERE {FTS_TABLE} MATCH :q ORDER BY bm25({FTS_TABLE})
+"""
+
+
+def populate(path: str, rows: int):
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    rng = np.random.default_rng(42)
+    models = ['iPhone 13', 'iPhone 13 Pro Max', 'Samsung S23 Ultra', 'Pixel 7 Pro', 'OnePlus 11']
+    data = zip(
+        (str(imei) for imei in rng.integers(10 ** 14, 10 ** 15, rows)),
+        rng.choice(models, rows).tolist(),
+        rng.choice(['4GB', '6GB', '8GB', '12GB'], rows).tolist(),
+        rng.choice(['64GB', '128GB', '256GB', '512GB'], rows).tolist(),
+        rng.choice(['4G', '5G'], rows).tolist(),
+        rng.uniform(100, 1500, rows).round(2).tolist(),
+    )
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT OR IGNORE INTO products (imei, model, ram, storage, network, price) VALUES (?, ?, ?, ?, ?, ?)",
+        data
+    )
+    conn.commit()
+    return conn
+
+
+def timed(label: str, conn: sqlite3.Connection, sql: str, param: str, repeat: int) -> int:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        count = len(conn.execute(sql, {'q': param}).fetchall())
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<8} {elapsed * 1000:>10.1f} ms  ({count} rows)")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Populating {args.rows} products...")
+        conn = populate(os.path.join(tmp, 'bench.db'), args.rows)
+
+        start = time.perf_counter()
+        for statement in CREATE_FTS:
+            conn.execute(statement)
+        conn.commit()
+        print(f"FTS index built in {time.perf_counter() - start:.1f}s")
+
+        for query in QUERIES:
+            print(f"'{query}'")
+            like = timed('LIKE', conn, LIKE_SQL, f"%{query}%", args.repeat)
+            match = timed('MATCH', conn, MATCH_SQL, match_expression(query), args.repeat)
+            assert like == match, f"result mismatch for '{query}'"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Latency of an unrelated endpoint during a login burst.
+
+Compares bcrypt verification inline on the event loop against the
+password pool used by AuthService, with both endpoints served from the
+same ASGI app and event loop.
+
+Usage: python -m benchmarks.login_load --logins 50 --pings 1000
+"""
+import argparse
+import asyncio
+import time
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from src.services.auth_service import pwd_context, verify_password_async
+
+PASSWORD = 'correct horse battery staple'
+
+
+def build_app(offload: bool, hashed: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/token")
+    async def login():
+        if offload:
+            ok = await verify_password_async(PASSWORD, hashed)
+        else:
+            ok = pwd_context.verify(PASSWORD, hashed)
+        return {"ok": ok}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run(offload: bool, hashed: str, logins: int, pings: int, interval: float) -> np.ndarray:
+    transport = httpx.ASGITransport(app=build_app(offload, hashed))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+
+        async def pinger():
+            # Open loop: latency is measured from when each ping was due, so
+            # time spent waiting on a blocked event loop is counted
+            started = time.perf_counter()
+            for i in range(pings):
+                due = started + i * interval
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                await client.get("/ping")
+                latencies.append(time.perf_counter() - due)
+
+        burst = [client.post("/token") for _ in range(logins)]
+        await asyncio.gather(pinger(), *burst)
+        return np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logins', type=int, default=50)
+    parser.add_argument('--pings', type=int, default=1000)
+    parser.add_argument('--interval', type=float, default=0.005, help='seconds between pings')
+    args = parser.parse_args()
+
+    hashed = pwd_context.hash(PASSWORD)
+    print(f"{args.logins} concurrent logins, {args.pings} /ping requests")
+    for label, offload in (('inline bcrypt', False), ('password pool', True)):
+        started = time.perf_counter()
+        latencies = asyncio.run(run(offload, hashed, args.logins, args.pings, args.interval))
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"{label:<16} /ping p50 {p50:>8.1f} ms  p99 {p99:>8.1f} ms  "
+              f"max {latencies.max():>8.1f} ms  total {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
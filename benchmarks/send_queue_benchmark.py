@@ -0,0 +1,88 @@
+"""Direct send_message bursts vs. the outbound SendQueue, against a fake Bot
+that enforces Telegram's flood limits.
+
+Usage: python -m benchmarks.send_queue_benchmark --chats 20 --messages 40
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict, deque
+from telegram.error import RetryAfter
+from src.utils.send_queue import SendQueue, MAX_MESSAGE_LENGTH
+
+
+class FakeBot:
+    """Accepts 1 message/s per chat and 30/s overall, else raises RetryAfter"""
+
+    def __init__(self, chat_rate: float = 1.0, global_rate: float = 30.0):
+        self.chat_interval = 1.0 / chat_rate
+        self.global_rate = global_rate
+        self._last_by_chat = {}
+        self._recent = deque()
+        self.calls = 0
+        self.flood_errors = 0
+        self.delivered = defaultdict(list)
+
+    async def send_message(self, chat_id, text, **options):
+        self.calls += 1
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > 1.0:
+            self._recent.popleft()
+        last = self._last_by_chat.get(chat_id)
+        if (last is not None and now - last < self.chat_interval) or len(self._recent) >= self.global_rate:
+            self.flood_errors += 1
+            raise RetryAfter(1)
+        if len(text) > MAX_MESSAGE_LENGTH:
+            raise ValueError("message is too long")
+        self._last_by_chat[chat_id] = now
+        self._recent.append(now)
+        self.delivered[chat_id].append(text)
+        await asyncio.sleep(0.005)  # network round trip
+        return {'chat_id': chat_id, 'text': text}
+
+
+def product_message(chat: int, i: int) -> str:
+    return f"📱 *Model {i}* for chat {chat}\n💾 RAM: 8GB\n📦 Stock: {i % 5}\n💰 Price: ${100 + i:,.2f}"
+
+
+async def direct(bot: FakeBot, chats: int, messages: int) -> int:
+    """The handler loop: one awaited send per product, failures dropped"""
+    async def burst(chat):
+        failed = 0
+        for i in range(messages):
+            try:
+                await bot.send_message(chat_id=chat, text=product_message(chat, i))
+            except RetryAfter:
+                failed += 1
+        return failed
+    return sum(await asyncio.gather(*(burst(chat) for chat in range(chats))))
+
+
+async def queued(bot: FakeBot, chats: int, messages: int) -> int:
+    queue = SendQueue(bot)
+    futures = [
+        queue.enqueue(chat, product_message(chat, i), parse_mode='Markdown')
+        for chat in range(chats) for i in range(messages)
+    ]
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    return sum(isinstance(result, Exception) for result in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chats', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"{args.chats} chats x {args.messages} messages")
+    for label, run in (('direct send_message', direct), ('SendQueue', queued)):
+        bot = FakeBot()
+        started = time.perf_counter()
+        lost = asyncio.run(run(bot, args.chats, args.messages))
+        delivered = sum(text.count('📱') for texts in bot.delivered.values() for text in texts)
+        print(f"{label:<20} {time.perf_counter() - started:>6.2f}s  api calls {bot.calls:>5}  "
+              f"flood errors {bot.flood_errors:>5}  delivered {delivered:>5}  lost {lost:>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Private memory per worker: each loading its own copy vs. mapping the shared snapshot.
+
+Each worker process loads the inventory and reports how much anonymous
+(unshared) memory that added; mapped snapshot pages live in the shared page
+cache instead. Linux only (reads /proc/self/status).
+
+Usage: python -m benchmarks.shared_snapshot_benchmark --rows 200000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+import pandas as pd
+from benchmarks.snapshot_benchmark import generate_products
+from src.utils.shared_snapshot import SharedSnapshot
+
+
+def rss_kb(field: str) -> int:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+
+def worker(mode: str, parquet_path: str, excel_path: str, results):
+    before = rss_kb('RssAnon:')
+    started = time.perf_counter()
+    if mode == 'private copy':
+        df = pd.read_parquet(parquet_path)
+    else:
+        df = SharedSnapshot(excel_path).frame()
+    # Touch every column, as building aggregates or an index would
+    for column in df.columns:
+        df[column].iloc[-1]
+    results.put((rss_kb('RssAnon:') - before, rss_kb('RssFile:'), time.perf_counter() - started))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        df = generate_products(args.rows)
+        parquet_path = os.path.join(directory, 'products.parquet')
+        df.to_parquet(parquet_path, index=False)
+        # Stand-in workbook: publishing only records its mtime and size
+        excel_path = os.path.join(directory, 'products.xlsx')
+        open(excel_path, 'wb').close()
+        SharedSnapshot(excel_path).publish(df)
+
+        print(f"{args.rows} rows, {args.workers} workers")
+        for mode in ('private copy', 'shared snapshot'):
+            results = multiprocessing.Queue()
+            processes = [
+                multiprocessing.Process(target=worker, args=(mode, parquet_path, excel_path, results))
+                for _ in range(args.workers)
+            ]
+            for process in processes:
+                process.start()
+            samples = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+            private = sum(sample[0] for sample in samples) / 1024
+            mapped = max(sample[1] for sample in samples) / 1024
+            load = max(sample[2] for sample in samples) * 1000
+            print(f"{mode:<16} private {private:>7.1f}MB total  file-backed {mapped:>6.1f}MB/worker  "
+                  f"load {load:>6.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
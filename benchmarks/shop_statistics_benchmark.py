@@ -0,0 +1,63 @@
+"""Per-shop filtering loop vs. the single-pass grouped engine.
+
+Usage: python -m benchmarks.shop_statistics_benchmark --shops 1000 --devices 1000000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from src.services.analytics_service import compute_shop_statistics
+
+
+def generate_devices(shops: int, devices: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'Shop_ID': rng.integers(1, shops + 1, devices),
+        'Model': rng.choice([f"Model {i}" for i in range(200)], devices),
+        'Status': rng.choice(['in_stock', 'sold', 'returned'], devices, p=[0.6, 0.35, 0.05]),
+        'Price': rng.uniform(100, 1500, devices).round(2),
+    })
+
+
+def per_shop_loop(df: pd.DataFrame) -> list:
+    """The original O(shops x rows) implementation"""
+    stats = []
+    for shop_id in df['Shop_ID'].unique():
+        shop_df = df[df['Shop_ID'] == shop_id]
+        stats.append({
+            'shop_id': shop_id,
+            'total_products': len(shop_df),
+            'in_stock': len(shop_df[shop_df['Status'] == 'in_stock']),
+            'models': shop_df['Model'].nunique()
+        })
+    return stats
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<32} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--shops', type=int, default=1000)
+    parser.add_argument('--devices', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = generate_devices(args.shops, args.devices)
+    print(f"{args.devices} devices across {args.shops} shops")
+
+    legacy = timed('per-shop filtering loop', lambda: per_shop_loop(df))
+    grouped = timed('grouped pass', lambda: compute_shop_statistics(df))
+    timed('grouped pass + value metrics', lambda: compute_shop_statistics(
+        df, ['total_products', 'in_stock', 'models', 'stock_value', 'average_price']
+    ))
+
+    expected = pd.DataFrame(legacy).set_index('shop_id')
+    assert (expected.sort_index().values == grouped.sort_index().values).all()
+
+
+if __name__ == '__main__':
+    main()
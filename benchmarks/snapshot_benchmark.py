@@ -0,0 +1,61 @@
+"""Cold Excel parsing vs. warm snapshot load.
+
+Usage: python -m benchmarks.snapshot_benchmark --rows 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from src.utils.snapshot import ExcelSnapshot
+
+
+def generate_products(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'ID': np.arange(1, rows + 1),
+        'Model': rng.choice(['iPhone 13', 'iPhone 13 Pro', 'Samsung S23', 'Pixel 7', 'OnePlus 11'], rows),
+        'RAM': rng.choice(['4GB', '6GB', '8GB', '12GB'], rows),
+        'Storage': rng.choice(['64GB', '128GB', '256GB', '512GB'], rows),
+        'Network': rng.choice(['4G', '5G'], rows),
+        'Color': rng.choice(['Black', 'White', 'Blue'], rows),
+        'Price': rng.uniform(300, 1500, rows).round(2),
+        'Stock': rng.integers(0, 10, rows),
+        'IMEI': rng.integers(10 ** 14, 10 ** 15, rows).astype(str),
+        'Shop_ID': rng.integers(1, 20, rows),
+        'Status': rng.choice(['in_stock', 'sold'], rows),
+    })
+
+
+def timed(label: str, fn, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<28} {elapsed * 1000:>10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'products.xlsx')
+        print(f"Writing {args.rows} rows to {path}...")
+        generate_products(args.rows).to_excel(path, index=False)
+
+        snapshot = ExcelSnapshot(path)
+        timed('pd.read_excel (cold)', lambda: pd.read_excel(path))
+        timed('snapshot first load', snapshot.load)
+        timed('snapshot warm load', snapshot.load, args.repeat)
+
+        os.utime(path)  # same content, new mtime: hash check only
+        timed('snapshot after touch', snapshot.load)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Updates/sec through the webhook endpoint, sequential vs. per-chat concurrent.
+
+Synthetic Update JSON is posted to the Starlette webhook app in-process; the
+handler simulates a slow search with a short sleep. Per-chat ordering is
+checked for the concurrent processor.
+
+Usage: python -m benchmarks.webhook_benchmark --updates 2000 --chats 50
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+import httpx
+from telegram import User
+from telegram.ext import Application, MessageHandler, filters
+from src.utils.bot_runtime import PerChatUpdateProcessor, create_webhook_app, WEBHOOK_PATH
+
+
+def synthetic_update(update_id: int, chat_id: int) -> dict:
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': f"User {chat_id}"},
+            'text': f"iphone {update_id}"
+        }
+    }
+
+
+def offline_application(concurrency: int) -> Application:
+    builder = Application.builder().token('123456:offline-benchmark').updater(None)
+    if concurrency > 1:
+        builder = builder.concurrent_updates(PerChatUpdateProcessor(concurrency))
+    application = builder.build()
+    # Pretend get_me already succeeded so no request leaves the process
+    application.bot._bot_user = User(id=123456, first_name='Bench', is_bot=True, username='bench_bot')
+    application.bot._initialized = True
+    return application
+
+
+async def run(concurrency: int, updates: int, chats: int, work: float):
+    application = offline_application(concurrency)
+    seen = defaultdict(list)
+    done = asyncio.Event()
+
+    async def handle(update, context):
+        await asyncio.sleep(work)
+        seen[update.effective_chat.id].append(update.update_id)
+        if sum(len(ids) for ids in seen.values()) == updates:
+            done.set()
+
+    application.add_handler(MessageHandler(filters.TEXT, handle))
+    transport = httpx.ASGITransport(app=create_webhook_app(application, secret=''))
+    async with application:
+        await application.start()
+        started = time.perf_counter()
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            for update_id in range(1, updates + 1):
+                response = await client.post(WEBHOOK_PATH, json=synthetic_update(update_id, update_id % chats))
+                response.raise_for_status()
+        await done.wait()
+        elapsed = time.perf_counter() - started
+        await application.stop()
+
+    ordered = all(ids == sorted(ids) for ids in seen.values())
+    return updates / elapsed, ordered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--updates', type=int, default=2000)
+    parser.add_argument('--chats', type=int, default=50)
+    parser.add_argument('--work-ms', type=float, default=20, help='simulated handler latency')
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{args.updates} updates across {args.chats} chats, {args.work_ms:.0f}ms per update")
+    for label, concurrency in (('sequential', 1), (f'per-chat x{args.concurrency}', args.concurrency)):
+        rate, ordered = asyncio.run(run(concurrency, args.updates, args.chats, args.work_ms / 1000))
+        print(f"{label:<16} {rate:>8.1f} updates/s  per-chat order preserved: {ordered}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,13 @@
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, MessageHandler, filters
 from loguru import logger
-from database.database import Database
-from services.data_sync import DataSyncService
-from handlers.command_handler import CommandHandler
-from handlers.message_handler import MessageHandler
+from src.database.database import Database
+from src.services.data_sync import DataSyncService
+from src.services.product_service import ProductService
+from src.services.permission_service import PermissionService
+from src.handlers.command_handler import CommandHandler as BotCommandHandler
+from src.handlers.message_handler import MessageHandler as BotMessageHandler
+from src.utils.pagination import PAGE_CALLBACK_PATTERN
+from src.utils.bot_runtime import PerChatUpdateProcessor, run_application
 import os
 from dotenv import load_dotenv
 
@@ -14,29 +18,41 @@ async def start():
     # Initialize database
     db = Database()
     await db.init_db()
-    session = await db.get_session()
     
     # Initialize services
-    data_sync = DataSyncService(session)
-    await data_sync.sync_from_excel()
+    async with db.session() as session:
+        await DataSyncService(session).sync_from_excel()
+    product_service = ProductService()  # uses the session scoped to each update
+    permission_service = PermissionService()
     
     # Initialize bot
-    app = Application.builder().token(os.getenv('TELEGRAM_BOT_TOKEN')).build()
+    app = (
+        Application.builder()
+        .token(os.getenv('TELEGRAM_BOT_TOKEN'))
+        .concurrent_updates(PerChatUpdateProcessor())
+        .build()
+    )
     
     # Initialize handlers
-    command_handler = CommandHandler(session)
-    message_handler = MessageHandler(session)
+    command_handler = BotCommandHandler(product_service, permission_service)
+    message_handler = BotMessageHandler(product_service, permission_service)
     
-    # Add handlers
-    app.add_handler(CommandHandler('start', command_handler.start))
-    app.add_handler(CommandHandler('help', command_handler.help))
-    app.add_handler(CommandHandler('refresh', command_handler.refresh))
-    app.add_handler(CommandHandler('stats', command_handler.stats))
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, message_handler.handle_message))
+    # Add handlers, each update getting its own database session
+    scoped = db.update_scope
+    app.add_handler(CommandHandler('start', scoped(command_handler.start_command)))
+    app.add_handler(CommandHandler('help', scoped(command_handler.help_command)))
+    app.add_handler(CommandHandler('refresh', scoped(command_handler.refresh_command)))
+    app.add_handler(CommandHandler('stats', scoped(command_handler.stats_command)))
+    app.add_handler(CommandHandler('transfer', scoped(command_handler.transfer_command)))
+    app.add_handler(CommandHandler('transfer_batch', scoped(command_handler.transfer_batch_command)))
+    app.add_handler(CommandHandler('update', scoped(command_handler.update_command)))
+    app.add_handler(CommandHandler('executor', command_handler.executor_command))
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, scoped(message_handler.handle_search)))
+    app.add_handler(CallbackQueryHandler(message_handler.handle_page, pattern=PAGE_CALLBACK_PATTERN))
     
     # Start bot
     logger.info("Starting bot...")
-    await app.run_polling()
+    await run_application(app)
 
 if __name__ == '__main__':
     import asyncio
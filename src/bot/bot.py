@@ -1,5 +1,8 @@
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, InlineQueryHandler, MessageHandler, filters
 from .handlers import MessageHandler as BotMessageHandler
+from ..utils.pagination import PAGE_CALLBACK_PATTERN
+from ..utils.send_queue import SendQueue
+from ..utils.bot_runtime import PerChatUpdateProcessor, run_application
 import os
 from dotenv import load_dotenv
 
@@ -15,18 +18,24 @@ class TelegramBot:
 
     async def start(self):
         """Initialize and start the bot"""
-        app = Application.builder().token(self.token).build()
+        app = (
+            Application.builder()
+            .token(self.token)
+            .concurrent_updates(PerChatUpdateProcessor())
+            .build()
+        )
+        self.handler.send_queue = SendQueue(app.bot)
         
         # Add handlers
         app.add_handler(CommandHandler("start", self.handler.start))
         app.add_handler(CommandHandler("help", self.handler.help))
         app.add_handler(CommandHandler("stock", self.handler.stock))
         app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handler.search))
+        app.add_handler(CallbackQueryHandler(self.handler.page, pattern=PAGE_CALLBACK_PATTERN))
+        app.add_handler(InlineQueryHandler(self.handler.inline_query))
         
-        # Start bot
-        await app.initialize()
-        await app.start()
-        await app.run_polling()
+        # Start bot (polling or webhook, per BOT_MODE)
+        await run_application(app)
 
 def run_bot():
     """Run the Telegram bot"""
@@ -2,8 +2,11 @@ from telegram import Update
 from telegram.ext import ContextTypes
 from ..utils.data_manager import DataManager
 from ..utils.message_formatter import MessageFormatter
-from ..utils.exceptions import DataError, ProductNotFoundError
+from ..utils.exceptions import DataError, ProductNotFoundError, QuerySyntaxError, TaskTimeoutError
+from ..utils.executor import executor
 from ..utils.logger import setup_logger
+from ..utils.pagination import ResultPager
+from ..utils.inline_articles import InlineArticleCache, INLINE_CACHE_TIME
 
 logger = setup_logger()
 
@@ -12,6 +15,9 @@ class MessageHandler:
         try:
             self.data_manager = DataManager()
             self.formatter = MessageFormatter()
+            self.pager = ResultPager(self.formatter.format_product)
+            self.inline_articles = InlineArticleCache(self.data_manager, self.formatter.format_product)
+            self.send_queue = None  # set by TelegramBot once the Application exists
             logger.info("MessageHandler initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize MessageHandler: {str(e)}")
@@ -48,7 +54,9 @@ class MessageHandler:
                 "• 8GB RAM\n"
                 "• 256GB\n"
                 "• 5G\n"
-                "• Blue\n\n"
+                "• Blue\n"
+                "• model:iphone ram:8gb -status:sold\n"
+                "• \"13 pro\" OR pixel\n\n"
                 "*Available Commands:*\n"
                 "/start - Start the bot\n"
                 "/help - Show this help\n"
@@ -64,25 +72,20 @@ class MessageHandler:
         """Handle search queries"""
         try:
             query = update.message.text.strip()
-            products = self.data_manager.search_products(query)
+            products = await executor.run_io(self.data_manager.search_products, query)
+            title = self.formatter.format_search_results(products, query)
             
-            await update.message.reply_text(
-                self.formatter.format_search_results(products, query),
-                parse_mode='Markdown'
-            )
-
-            for product in products[:5]:
-                await update.message.reply_text(
-                    self.formatter.format_product(product),
-                    parse_mode='Markdown'
-                )
-            
-            if len(products) > 5:
-                await update.message.reply_text(
-                    f"Showing top 5 results out of {len(products)} matches."
-                )
+            if products:
+                await self.pager.reply(update.message, title, products)
+            else:
+                await update.message.reply_text(title, parse_mode='Markdown')
             
             logger.info(f"Search handled for user {update.effective_user.id}, query: '{query}'")
+        except TaskTimeoutError:
+            logger.warning(f"Search timed out for user {update.effective_user.id}")
+            await update.message.reply_text("Search is taking too long. Please try a more specific query.")
+        except QuerySyntaxError as e:
+            await update.message.reply_text(f"Could not understand that search: {str(e)}")
         except DataError as e:
             logger.warning(f"Search error for user {update.effective_user.id}: {str(e)}")
             await update.message.reply_text(f"Search error: {str(e)}")
@@ -90,24 +93,39 @@ class MessageHandler:
             logger.error(f"Unexpected error in search: {str(e)}")
             await update.message.reply_text("Sorry, something went wrong. Please try again later.")
 
+    async def page(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle Prev/Next buttons on search results"""
+        try:
+            await self.pager.handle_callback(update, context)
+        except Exception as e:
+            logger.error(f"Error paging search results: {str(e)}")
+
+    async def inline_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle @bot inline queries from any chat"""
+        inline_query = update.inline_query
+        try:
+            offset = int(inline_query.offset or 0)
+            results, next_offset = await executor.run_io(self.inline_articles.page, inline_query.query, offset)
+            await inline_query.answer(
+                results, cache_time=INLINE_CACHE_TIME, is_personal=False, next_offset=next_offset
+            )
+        except Exception as e:
+            logger.error(f"Error in inline query: {str(e)}")
+
     async def stock(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stock command"""
         try:
-            low_stock = self.data_manager.get_low_stock_products()
+            low_stock = await executor.run_io(self.data_manager.get_low_stock_products)
             
             if not low_stock:
                 await update.message.reply_text("No products with low stock.")
                 return
 
-            await update.message.reply_text(
-                f"📉 Found {len(low_stock)} products with low stock:"
-            )
-
+            # Queued messages to one chat are coalesced and paced to the flood limits
+            chat_id = update.effective_chat.id
+            self.send_queue.enqueue(chat_id, f"📉 Found {len(low_stock)} products with low stock:", parse_mode='Markdown')
             for product in low_stock:
-                await update.message.reply_text(
-                    self.formatter.format_product(product),
-                    parse_mode='Markdown'
-                )
+                self.send_queue.enqueue(chat_id, self.formatter.format_product(product), parse_mode='Markdown')
             
             logger.info(f"Stock command handled for user {update.effective_user.id}")
         except Exception as e:
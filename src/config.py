@@ -0,0 +1,14 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class Settings:
+    """Web, database and sync settings read from the environment (see .env.example)"""
+    DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite+aiosqlite:///data/inventory.db')
+    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key')
+    ADMIN_USERNAME = os.getenv('ADMIN_USERNAME', 'admin')
+    ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', '')
+    EXCEL_FILE_PATH = os.getenv('EXCEL_FILE_PATH', 'data/products.xlsx')
+
+settings = Settings()
@@ -1,6 +1,17 @@
+import atexit
+import os
+import threading
+import time
+import numpy as np
 import pandas as pd
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Set, Tuple
 from datetime import datetime, timedelta
+from .utils.snapshot import read_excel_cached, write_excel_cached
+from .utils.search_index import TrigramIndex, index_key, position_index
+from .utils.journal import Journal
+from .utils.query_cache import QueryCache, normalize_query
+from .utils.query_language import compile_mask, is_plain, parse_query
+from .utils.logger import setup_logger
 from .models import Device, Purchase, Return, UsedDevicePurchase, Shop
 from .exceptions import (
     DeviceNotFoundError, 
@@ -9,57 +20,235 @@ from .exceptions import (
     ReturnError
 )
 
+logger = setup_logger()
+
+# Status is left out on purpose: it changes in place on every sale/return
+DEVICE_SEARCH_FIELDS = [
+    'IMEI', 'Serial_Number', 'Model', 'RAM', 'Network', 'Condition'
+]
+
+# Query language field -> devices workbook column
+DEVICE_QUERY_COLUMNS = {
+    'model': 'Model',
+    'ram': 'RAM',
+    'network': 'Network',
+    'condition': 'Condition',
+    'status': 'Status',
+    'imei': 'IMEI',
+    'price': 'Price',
+    'shop': 'Shop_ID'
+}
+
+# Workbook table -> key column used to upsert journaled rows
+TABLE_KEYS = {
+    'devices': 'IMEI',
+    'shops': 'ID',
+    'purchases': 'ID',
+    'returns': 'ID',
+    'used_purchases': 'ID'
+}
+
+FLUSH_WINDOW_SECONDS = float(os.getenv('FLUSH_WINDOW_SECONDS', '5'))
+JOURNAL_COMPACT_BYTES = int(os.getenv('JOURNAL_COMPACT_BYTES', str(1024 * 1024)))
+
+# Workbook column names that don't follow the Title_Case of the model fields
+EXCEL_COLUMNS = {
+    'id': 'ID',
+    'imei': 'IMEI',
+    'device_imei': 'Device_IMEI',
+    'ram': 'RAM',
+    'shop_id': 'Shop_ID',
+    'purchase_id': 'Purchase_ID'
+}
+
+def to_excel_row(record: Dict) -> Dict:
+    """Map a model's to_dict() keys onto the workbook column names"""
+    return {EXCEL_COLUMNS.get(key, key.title()): value for key, value in record.items()}
+
 class DataManager:
-    def __init__(self, data_dir: str):
+    def __init__(self, data_dir: str,
+                 flush_window: float = FLUSH_WINDOW_SECONDS,
+                 compact_bytes: int = JOURNAL_COMPACT_BYTES):
         self.data_dir = data_dir
+        self.flush_window = flush_window
+        self.compact_bytes = compact_bytes
         self._devices_df = None
         self._shops_df = None
         self._purchases_df = None
         self._returns_df = None
         self._used_purchases_df = None
+        self._device_index = TrigramIndex(DEVICE_SEARCH_FIELDS)
+        self.search_cache = QueryCache()
+        self._positions: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.RLock()
+        self._dirty: Set[str] = set()
+        self._flush_lock = threading.Lock()
+        self._flush_cond = threading.Condition()
+        self._flush_deadline: Optional[float] = None
+        self._journal = Journal(f"{data_dir}/journal.jsonl")
         self.refresh_data()
+        
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name='workbook-flusher', daemon=True
+        )
+        self._flusher.start()
+        # The flusher is a daemon thread; write whatever is still pending on exit
+        atexit.register(self.flush)
 
     def refresh_data(self):
-        """Reload all data from Excel files"""
-        self._devices_df = pd.read_excel(f"{self.data_dir}/devices.xlsx")
-        self._shops_df = pd.read_excel(f"{self.data_dir}/shops.xlsx")
-        self._purchases_df = pd.read_excel(f"{self.data_dir}/purchases.xlsx")
-        self._returns_df = pd.read_excel(f"{self.data_dir}/returns.xlsx")
-        self._used_purchases_df = pd.read_excel(f"{self.data_dir}/used_purchases.xlsx")
-
-    def save_data(self):
-        """Save all current data to Excel files"""
-        self._devices_df.to_excel(f"{self.data_dir}/devices.xlsx", index=False)
-        self._shops_df.to_excel(f"{self.data_dir}/shops.xlsx", index=False)
-        self._purchases_df.to_excel(f"{self.data_dir}/purchases.xlsx", index=False)
-        self._returns_df.to_excel(f"{self.data_dir}/returns.xlsx", index=False)
-        self._used_purchases_df.to_excel(f"{self.data_dir}/used_purchases.xlsx", index=False)
+        """Reload all data from Excel files and replay the journal on top"""
+        with self._lock:
+            self._dirty = set()
+            for table in TABLE_KEYS:
+                setattr(self, f"_{table}_df", read_excel_cached(self._table_path(table)))
+            self._device_index.build(self._devices_df)
+            self.search_cache.bump()
+            self._positions = {
+                table: position_index(getattr(self, f"_{table}_df")[key])
+                for table, key in TABLE_KEYS.items()
+            }
+            
+            replayed = 0
+            for record in self._journal.replay():
+                for change in record['changes']:
+                    self._apply(change['table'], change['row'])
+                replayed += 1
+            if replayed:
+                logger.info(f"Replayed {replayed} journaled mutations")
+        
+        if self._dirty:
+            self._schedule_flush()
+
+    def save_data(self) -> List[str]:
+        """Save tables changed since the last save to their Excel files"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            frames = {table: getattr(self, f"_{table}_df").copy() for table in dirty}
+        
+        try:
+            for table, df in frames.items():
+                write_excel_cached(df, self._table_path(table))
+        except Exception:
+            with self._lock:
+                self._dirty |= dirty
+            raise
+        return sorted(frames)
+
+    def flush(self):
+        """Write dirty tables now and drop the journal they cover.
+
+        Runs at interpreter exit; otherwise the background flusher does it.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = self._journal.rotate()
+            saved = self.save_data()
+            if pending is not None:
+                self._journal.discard(pending)
+            if saved:
+                logger.info(f"Flushed {', '.join(saved)} to Excel")
+
+    def _schedule_flush(self, immediate: bool = False):
+        """Start a flush window, or cut the current one short"""
+        with self._flush_cond:
+            now = time.monotonic()
+            if immediate:
+                self._flush_deadline = now
+            elif self._flush_deadline is None:
+                self._flush_deadline = now + self.flush_window
+            self._flush_cond.notify()
+
+    def _flush_loop(self):
+        while True:
+            with self._flush_cond:
+                while self._flush_deadline is None or time.monotonic() < self._flush_deadline:
+                    timeout = None
+                    if self._flush_deadline is not None:
+                        timeout = self._flush_deadline - time.monotonic()
+                    self._flush_cond.wait(timeout)
+                self._flush_deadline = None
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Background flush failed: {str(e)}")
+
+    def _commit(self, changes: List[Tuple[str, Dict]]):
+        """Durably journal one mutation, then apply it in memory"""
+        with self._lock:
+            self._journal.append({
+                'ts': datetime.now().isoformat(),
+                'changes': [{'table': table, 'row': row} for table, row in changes]
+            })
+            for table, row in changes:
+                self._apply(table, row)
+        
+        self._schedule_flush(immediate=self._journal.size() >= self.compact_bytes)
+
+    def _apply(self, table: str, row: Dict):
+        """Upsert a row by its table's key column, keeping indexes in step"""
+        key_column = TABLE_KEYS[table]
+        positions = self._positions[table]
+        key = index_key(row[key_column])
+        position = positions.get(key)
+        df = getattr(self, f"_{table}_df")
+        self._dirty.add(table)
+        if table == 'devices':
+            self.search_cache.bump()
+        
+        if position is None:
+            df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+            setattr(self, f"_{table}_df", df)
+            positions[key] = len(df) - 1
+            if table == 'devices':
+                self._device_index.add(len(df) - 1, row)
+            return
+        
+        updates = {column: value for column, value in row.items() if column != key_column}
+        for column, value in updates.items():
+            df.loc[position, column] = value
+        if table == 'devices' and set(updates) & set(DEVICE_SEARCH_FIELDS):
+            self._device_index.build(df)
+
+    def _table_path(self, table: str) -> str:
+        return f"{self.data_dir}/{table}.xlsx"
 
     def get_device_by_imei(self, imei: str) -> Optional[Device]:
         """Get device details by IMEI"""
-        mask = self._devices_df['IMEI'] == imei
-        if not mask.any():
+        position = self._positions['devices'].get(index_key(imei))
+        if position is None:
             return None
-        return Device.from_dict(self._devices_df[mask].iloc[0])
+        return Device.from_dict(self._devices_df.iloc[position])
 
     def search_devices(self, query: str, shop_id: Optional[int] = None,
                       condition: Optional[str] = None) -> List[Device]:
-        """Search devices by any field with optional filters"""
-        query = str(query).lower()
-        df = self._devices_df
-        
-        if shop_id is not None:
-            df = df[df['Shop_ID'] == shop_id]
-        
-        if condition is not None:
-            df = df[df['Condition'] == condition]
+        """Search devices by text or a structured query (e.g. 'status:in_stock ram:8gb'), with optional filters"""
+        query = normalize_query(query)
         
-        results = []
-        for _, row in df.iterrows():
-            if any(query in str(value).lower() for value in row):
-                results.append(Device.from_dict(row))
+        def matching_positions():
+            tree = parse_query(query) if query else None
+            if tree is None or is_plain(tree, query):
+                positions = self._device_index.search(query)
+            else:
+                positions = np.flatnonzero(
+                    compile_mask(tree, self._devices_df, DEVICE_QUERY_COLUMNS, self._device_text_mask)
+                )
+            df = self._devices_df.iloc[positions]
+            mask = np.ones(len(df), dtype=bool)
+            if shop_id is not None:
+                mask &= (df['Shop_ID'] == shop_id).to_numpy()
+            if condition is not None:
+                mask &= (df['Condition'] == condition).to_numpy()
+            return positions[mask]
         
-        return results
+        with self._lock:
+            positions = self.search_cache.get_or_compute((query, shop_id, condition), matching_positions)
+            df = self._devices_df.iloc[positions]
+        return [Device.from_dict(row) for row in df.to_dict('records')]
+
+    def _device_text_mask(self, text: str) -> np.ndarray:
+        mask = np.zeros(len(self._devices_df), dtype=bool)
+        mask[self._device_index.search(text)] = True
+        return mask
 
     def record_purchase(self, device_imei: str, customer_name: str,
                        customer_phone: str, shop_id: int,
@@ -88,19 +277,16 @@ class DataManager:
             notes=notes
         )
         
-        # Update device status
-        mask = self._devices_df['IMEI'] == device_imei
-        self._devices_df.loc[mask, 'Status'] = 'sold'
-        self._devices_df.loc[mask, 'Purchase_Date'] = purchase_date.isoformat()
-        self._devices_df.loc[mask, 'Warranty_End'] = (purchase_date + timedelta(days=365)).isoformat()
-        
-        # Add purchase record
-        self._purchases_df = pd.concat([
-            self._purchases_df,
-            pd.DataFrame([purchase.to_dict()])
-        ], ignore_index=True)
-        
-        self.save_data()
+        # Update device status and add purchase record
+        self._commit([
+            ('devices', {
+                'IMEI': device_imei,
+                'Status': 'sold',
+                'Purchase_Date': purchase_date.isoformat(),
+                'Warranty_End': (purchase_date + timedelta(days=365)).isoformat()
+            }),
+            ('purchases', to_excel_row(purchase.to_dict()))
+        ])
         return purchase
 
     def process_return(self, purchase_id: int, reason: str,
@@ -108,11 +294,11 @@ class DataManager:
                       notes: Optional[str] = None) -> Return:
         """Process a device return"""
         # Verify purchase exists and is within return period
-        purchase_mask = self._purchases_df['ID'] == purchase_id
-        if not purchase_mask.any():
+        purchase_position = self._positions['purchases'].get(index_key(purchase_id))
+        if purchase_position is None:
             raise ReturnError("Purchase not found")
         
-        purchase_data = self._purchases_df[purchase_mask].iloc[0]
+        purchase_data = self._purchases_df.iloc[purchase_position]
         purchase_date = datetime.fromisoformat(purchase_data['Purchase_Date'])
         
         if datetime.now() - purchase_date > timedelta(days=3):
@@ -132,17 +318,14 @@ class DataManager:
             notes=notes
         )
         
-        # Update device status
-        device_mask = self._devices_df['IMEI'] == purchase_data['Device_IMEI']
-        self._devices_df.loc[device_mask, 'Status'] = 'returned'
-        
-        # Add return record
-        self._returns_df = pd.concat([
-            self._returns_df,
-            pd.DataFrame([return_record.to_dict()])
-        ], ignore_index=True)
-        
-        self.save_data()
+        # Update device status and add return record
+        changes = [('returns', to_excel_row(return_record.to_dict()))]
+        if index_key(purchase_data['Device_IMEI']) in self._positions['devices']:
+            changes.insert(0, ('devices', {
+                'IMEI': purchase_data['Device_IMEI'],
+                'Status': 'returned'
+            }))
+        self._commit(changes)
         return return_record
 
     def purchase_used_device(self, imei: str, serial_number: str,
@@ -183,17 +366,10 @@ class DataManager:
         )
         
         # Add records to DataFrames
-        self._devices_df = pd.concat([
-            self._devices_df,
-            pd.DataFrame([device.to_dict()])
-        ], ignore_index=True)
-        
-        self._used_purchases_df = pd.concat([
-            self._used_purchases_df,
-            pd.DataFrame([used_purchase.to_dict()])
-        ], ignore_index=True)
-        
-        self.save_data()
+        self._commit([
+            ('devices', to_excel_row(device.to_dict())),
+            ('used_purchases', to_excel_row(used_purchase.to_dict()))
+        ])
         return device, used_purchase
 
     def get_device_history(self, imei: str) -> Dict[str, List]:
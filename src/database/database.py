@@ -1,24 +1,132 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import AsyncIterator, Dict, Optional
+import os
+import threading
+import time
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from .models import Base
+from .fts import create_fts
 from src.config import settings
 
-class Database:
+# Connection pool tuning
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+# Session bound to the Telegram update currently being handled
+current_session: ContextVar[Optional[AsyncSession]] = ContextVar('current_session', default=None)
+
+class PoolStats:
+    """Checkout wait times and connection usage for one engine"""
+    
     def __init__(self):
-        self.engine = create_async_engine(
-            settings.DATABASE_URL,
-            echo=False
-        )
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def attach(self, pool):
+        event.listen(pool, 'checkout', self._on_checkout)
+        event.listen(pool, 'checkin', self._on_checkin)
+    
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+    
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+    
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+    
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'avg_wait_ms': round(self.total_wait / self.waits * 1000, 3) if self.waits else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3)
+            }
+
+class Database:
+    def __init__(self, url: Optional[str] = None):
+        url = url or settings.DATABASE_URL
+        pool_options = {'pool_pre_ping': DB_POOL_PRE_PING}
+        if ':memory:' not in url:
+            # In-memory SQLite uses a single static connection and takes no sizing
+            pool_options.update(
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT
+            )
+        self.engine = create_async_engine(url, echo=False, **pool_options)
         self.async_session = sessionmaker(
             self.engine,
             class_=AsyncSession,
             expire_on_commit=False
         )
+        self.stats = PoolStats()
+        self.stats.attach(self.engine.sync_engine.pool)
     
     async def init_db(self):
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(create_fts)
     
-    async def get_session(self) -> AsyncSession:
+    @asynccontextmanager
+    async def session(self, checkout: bool = True) -> AsyncIterator[AsyncSession]:
+        """A session that is rolled back on error and always closed.
+        
+        With `checkout` the connection is taken from the pool up front so the
+        wait is recorded; otherwise it is only checked out on first use.
+        """
         async with self.async_session() as session:
-            return session
\ No newline at end of file
+            if checkout:
+                started = time.perf_counter()
+                await session.connection()
+                self.stats.record_wait(time.perf_counter() - started)
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+    
+    async def get_session(self) -> AsyncIterator[AsyncSession]:
+        """FastAPI dependency: one session per request"""
+        async with self.session() as session:
+            yield session
+    
+    def update_scope(self, callback):
+        """Wrap a Telegram handler so each update runs in its own session"""
+        @wraps(callback)
+        async def wrapper(update, context):
+            # Most updates never touch the database, so check out lazily
+            async with self.session(checkout=False) as session:
+                token = current_session.set(session)
+                try:
+                    return await callback(update, context)
+                finally:
+                    current_session.reset(token)
+        return wrapper
+    
+    def pool_status(self) -> Dict:
+        pool = self.engine.sync_engine.pool
+        status = self.stats.snapshot()
+        if hasattr(pool, 'size'):
+            status.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+        return status
@@ -0,0 +1,66 @@
+"""SQLite FTS5 index over the searchable product columns.
+
+The virtual table uses the trigram tokenizer (SQLite 3.34+), so a quoted
+MATCH query behaves like a case-insensitive substring search, and it is
+kept in sync with `products` by triggers.
+"""
+import sqlite3
+from sqlalchemy import text
+
+FTS_TABLE = 'products_fts'
+FTS_COLUMNS = ['model', 'ram', 'storage', 'network']
+FTS_MIN_QUERY_LENGTH = 3  # trigrams cannot match anything shorter
+
+_columns = ', '.join(FTS_COLUMNS)
+_new_values = ', '.join(f"new.{col}" for col in FTS_COLUMNS)
+_old_values = ', '.join(f"old.{col}" for col in FTS_COLUMNS)
+
+CREATE_FTS = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_columns}, content='products', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF {_columns} ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS products_fts_update",
+    "DROP TRIGGER IF EXISTS products_fts_delete",
+    "DROP TRIGGER IF EXISTS products_fts_insert",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}"
+]
+
+def trigram_supported() -> bool:
+    """Whether the linked SQLite library ships the trigram tokenizer"""
+    return sqlite3.sqlite_version_info >= (3, 34, 0)
+
+def create_fts(connection):
+    """Create the index and triggers on a SQLite connection if they are missing.
+
+    For `create_all` bootstraps (run via `conn.run_sync`); the alembic
+    revision does the same for migrated databases. Other databases keep
+    using ILIKE search.
+    """
+    if connection.dialect.name != 'sqlite' or not trigram_supported():
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': FTS_TABLE}
+    ).first()
+    if exists:
+        return
+    for statement in CREATE_FTS:
+        connection.execute(text(statement))
+
+def match_expression(query: str) -> str:
+    """Quote a user query as a single FTS5 phrase (substring match)"""
+    return '"' + query.replace('"', '""') + '"'
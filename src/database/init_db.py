@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from src.database.models import Base, User, Role
+from src.database.fts import create_fts
 from src.config import settings
 from src.services.auth_service import AuthService
 import asyncio
@@ -15,8 +16,9 @@ async def init_database():
     async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     
     async with engine.begin() as conn:
-        # Create all tables
+        # Create all tables, plus the FTS search index on SQLite
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_fts)
     
     # Create default admin user and roles if they don't exist
     async with async_session() as session:
@@ -44,7 +46,7 @@ async def init_database():
         if not admin_user:
             admin_user = User(
                 username=settings.ADMIN_USERNAME,
-                password_hash=auth_service.get_password_hash(settings.ADMIN_PASSWORD),
+                password_hash=await auth_service.get_password_hash_async(settings.ADMIN_PASSWORD),
                 is_active=True
             )
             admin_user.roles.append(admin_role)
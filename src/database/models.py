@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Table, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -47,10 +47,19 @@ class Product(Base):
     condition = Column(String)
     status = Column(String, default='in_stock')
     shop_id = Column(Integer, ForeignKey('shops.id'))
+    row_hash = Column(String(40))  # hash of the synced Excel columns
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     shop = relationship("Shop", back_populates="products")
+    
+    # Composite indexes for the structured search filters (shop:, condition:, status:, price:);
+    # condition: compares lower(condition), so its index is on that expression
+    __table_args__ = (
+        Index('ix_products_shop_id_status', 'shop_id', 'status'),
+        Index('ix_products_status_price', 'status', 'price'),
+        Index('ix_products_lower_condition_status', func.lower(condition), status),
+    )
 
 class Shop(Base):
     __tablename__ = 'shops'
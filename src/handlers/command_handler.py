@@ -1,19 +1,22 @@
+import re
 from telegram import Update
 from telegram.ext import ContextTypes
-from services.product_service import ProductService
-from services.permission_service import PermissionService
-from services.transfer_service import TransferService
-from services.analytics_service import AnalyticsService
-from utils.formatters import format_help_message, format_product_details
-from handlers.stats_handler import StatsHandler
+from src.services.product_service import ProductService
+from src.services.permission_service import PermissionService
+from src.services.transfer_service import TransferService
+from src.services.analytics_service import AnalyticsService
+from src.utils.formatters import format_help_message, format_product_details
+from src.handlers.stats_handler import StatsHandler
+from src.utils.executor import executor
+from src.utils.exceptions import TaskTimeoutError
 
 class CommandHandler:
     def __init__(self, product_service: ProductService, 
                  permission_service: PermissionService):
         self.product_service = product_service
         self.permission_service = permission_service
-        self.transfer_service = TransferService()
         self.analytics_service = AnalyticsService()
+        self.transfer_service = TransferService(analytics=self.analytics_service)
         self.stats_handler = StatsHandler(self.analytics_service, permission_service)
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -40,7 +43,12 @@ class CommandHandler:
             await update.message.reply_text('⛔ You do not have permission to use this command.')
             return
         
-        self.product_service.refresh_data()
+        try:
+            await self.product_service.sync_from_excel()
+            await self.analytics_service.refresh_async()
+        except TaskTimeoutError:
+            await update.message.reply_text('⌛ Refresh is taking too long, please try again later.')
+            return
         await update.message.reply_text('✅ Product data has been refreshed.')
     
     async def transfer_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -57,8 +65,8 @@ class CommandHandler:
             from_shop = int(from_shop)
             to_shop = int(to_shop)
             
-            success, message = self.transfer_service.transfer_product(
-                product_imei, from_shop, to_shop, user_id
+            success, message = await executor.run_io(
+                self.transfer_service.transfer_product, product_imei, from_shop, to_shop, user_id
             )
             
             if success:
@@ -73,6 +81,39 @@ class CommandHandler:
         except Exception as e:
             await update.message.reply_text(f'❌ Error: {str(e)}')
     
+    async def transfer_batch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /transfer_batch command"""
+        user_id = update.effective_user.id
+        
+        if not self.permission_service.check_permission(user_id, 'transfer'):
+            await update.message.reply_text('⛔ You do not have permission to use this command.')
+            return
+        
+        try:
+            # IMEIs may follow on the same line or be pasted one per line / comma separated
+            from_shop, to_shop, *rest = context.args
+            from_shop = int(from_shop)
+            to_shop = int(to_shop)
+            product_imeis = [imei for imei in re.split(r'[\s,;]+', ' '.join(rest)) if imei]
+            if not product_imeis:
+                raise ValueError
+            
+            success, message = await executor.run_io(
+                self.transfer_service.transfer_many, product_imeis, from_shop, to_shop, user_id
+            )
+            
+            if success:
+                await update.message.reply_text(f'✅ {message}')
+            else:
+                await update.message.reply_text(f'❌ {message}')
+                
+        except ValueError:
+            await update.message.reply_text(
+                'Usage: /transfer_batch [from_shop_id] [to_shop_id] [imei] [imei] ...'
+            )
+        except Exception as e:
+            await update.message.reply_text(f'❌ Error: {str(e)}')
+    
     async def update_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /update command"""
         user_id = update.effective_user.id
@@ -94,4 +135,24 @@ class CommandHandler:
     
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command"""
-        await self.stats_handler.handle_stats(update, context)
\ No newline at end of file
+        await self.stats_handler.handle_stats(update, context)
+    
+    async def executor_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /executor command"""
+        user_id = update.effective_user.id
+        
+        if not self.permission_service.check_permission(user_id, 'view_metrics'):
+            await update.message.reply_text('⛔ You do not have permission to use this command.')
+            return
+        
+        message = ["⚙️ *Executor Pools*"]
+        for name, pool in executor.stats().items():
+            message.append(
+                f"\n*{name}* ({pool['workers']} workers)\n"
+                f"Queued: {pool['queued']} (max {pool['max_queued']}), Running: {pool['running']}\n"
+                f"Completed: {pool['completed']}, Failed: {pool['failed']}, "
+                f"Timed out: {pool['timed_out']}, Cancelled: {pool['cancelled']}\n"
+                f"Latency: {pool['avg_latency_ms']}ms avg, {pool['max_latency_ms']}ms max"
+            )
+        
+        await update.message.reply_text('\n'.join(message), parse_mode='Markdown')
\ No newline at end of file
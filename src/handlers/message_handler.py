@@ -1,13 +1,16 @@
 from telegram import Update
 from telegram.ext import ContextTypes
-from services.product_service import ProductService
-from services.permission_service import PermissionService
-from utils.formatters import format_product_details
+from src.services.product_service import ProductService
+from src.services.permission_service import PermissionService
+from src.utils.formatters import format_db_product
+from src.utils.pagination import ResultPager
+from src.utils.exceptions import QuerySyntaxError
 
 class MessageHandler:
     def __init__(self, product_service: ProductService, permission_service: PermissionService):
         self.product_service = product_service
         self.permission_service = permission_service
+        self.pager = ResultPager(format_db_product)
     
     async def handle_search(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle search queries"""
@@ -18,15 +21,18 @@ class MessageHandler:
             return
         
         query = update.message.text
-        products = self.product_service.search_products(query)
+        try:
+            products = await self.product_service.search_products(query)
+        except QuerySyntaxError as e:
+            await update.message.reply_text(f'⚠️ {str(e)}')
+            return
         
         if products:
-            # Send each product as a separate message
-            for product in products:
-                formatted_msg = format_product_details(product)
-                await update.message.reply_text(formatted_msg, parse_mode='Markdown')
-                
-            if len(products) > 1:
-                await update.message.reply_text(f'Found {len(products)} matching products.')
+            # One message per page; Prev/Next page through the cached results
+            await self.pager.reply(update.message, f'Found {len(products)} matching products.', products)
         else:
-            await update.message.reply_text('No products found matching your search. Please try a different term.')
\ No newline at end of file
+            await update.message.reply_text('No products found matching your search. Please try a different term.')
+    
+    async def handle_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle Prev/Next buttons on search results"""
+        await self.pager.handle_callback(update, context)
\ No newline at end of file
@@ -1,7 +1,7 @@
 from telegram import Update
 from telegram.ext import ContextTypes
-from services.analytics_service import AnalyticsService
-from services.permission_service import PermissionService
+from src.services.analytics_service import AnalyticsService
+from src.services.permission_service import PermissionService
 
 class StatsHandler:
     def __init__(self, analytics_service: AnalyticsService, 
@@ -17,6 +17,9 @@ class StatsHandler:
             await update.message.reply_text('⛔ You do not have permission to view statistics.')
             return
         
+        # Pick up snapshots published by other processes, then read the aggregates
+        await self.analytics.sync()
+        
         # Get various statistics
         inventory = self.analytics.get_inventory_summary()
         prices = self.analytics.get_price_analytics()
@@ -1,54 +1,244 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+import math
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from src.utils.shared_snapshot import load_products, shared_snapshot
+from src.utils.search_index import index_key, position_index
+from src.utils.executor import executor
+
+# Metric name -> (column, aggregation) for compute_shop_statistics
+SHOP_METRICS = {
+    'total_products': ('Shop_ID', 'size'),
+    'in_stock': ('In_Stock', 'sum'),
+    'models': ('Model', 'nunique'),
+    'stock_value': ('In_Stock_Value', 'sum'),
+    'average_price': ('Price', 'mean'),
+    'price_sum': ('Price', 'sum'),
+    'price_count': ('Price', 'count')
+}
+DEFAULT_SHOP_METRICS = ['total_products', 'in_stock', 'models']
+
+def compute_shop_statistics(df: pd.DataFrame,
+                            metrics: Sequence[str] = DEFAULT_SHOP_METRICS) -> pd.DataFrame:
+    """Per-shop metrics for every shop in a single grouped pass"""
+    in_stock = df['Status'].eq('in_stock')
+    frame = df.assign(
+        In_Stock=in_stock,
+        In_Stock_Value=df['Price'].where(in_stock, 0.0)
+    )
+    return frame.groupby('Shop_ID', sort=False).agg(
+        **{metric: SHOP_METRICS[metric] for metric in metrics}
+    )
+
+class InventoryAggregates:
+    """Inventory counts and price statistics, updated one product at a time.
+
+    Every product is held as a (shop_id, status, model, price) tuple so a
+    change to one product only moves it between the counters. Only transfers
+    are applied this way (TransferService via record_transfer); sales and
+    edits publish a new snapshot and AnalyticsService.sync rebuilds.
+    """
+
+    COLUMNS = ['IMEI', 'Shop_ID', 'Status', 'Model', 'Price']
+
+    def __init__(self):
+        self.build(pd.DataFrame(columns=self.COLUMNS))
+
+    def build(self, df: pd.DataFrame):
+        """Compute all aggregates from a products frame"""
+        df = df.reindex(columns=self.COLUMNS)
+        self.products: List[tuple] = list(
+            df[['Shop_ID', 'Status', 'Model', 'Price']].itertuples(index=False, name=None)
+        )
+        self._positions = position_index(df['IMEI'])
+        self.status_counts = Counter(df['Status'].value_counts().to_dict())
+        self.model_counts = Counter(df['Model'].value_counts().to_dict())
+
+        shops = compute_shop_statistics(
+            df, ['total_products', 'in_stock', 'stock_value', 'price_sum', 'price_count']
+        )
+        self.shop_totals = Counter(shops['total_products'].to_dict())
+        self.shop_in_stock = Counter(shops['in_stock'].to_dict())
+        self.shop_stock_value = Counter(shops['stock_value'].to_dict())
+        self.shop_price_sum = Counter(shops['price_sum'].to_dict())
+        self.shop_price_count = Counter(shops['price_count'].to_dict())
+        self.shop_models: Dict[int, Counter] = defaultdict(Counter)
+        for (shop_id, model), count in df.groupby(['Shop_ID', 'Model'], sort=False).size().items():
+            self.shop_models[shop_id][model] = count
+
+        prices = np.sort(df['Price'].dropna().to_numpy(dtype=float))
+        self.prices: List[float] = prices.tolist()
+        self.price_sum = float(prices.sum())
+
+    def update(self, imei: str, **changes) -> bool:
+        """Apply field changes (shop_id, status, model, price) to one product"""
+        position = self._positions.get(index_key(imei))
+        if position is None:
+            return False
+
+        product = self.products[position]
+
+        shop_id, status, model, price = product
+        updated = (
+            changes.get('shop_id', shop_id),
+            changes.get('status', status),
+            changes.get('model', model),
+            changes.get('price', price)
+        )
+        self._remove(product)
+        self._add(updated)
+        self.products[position] = updated
+        return True
+
+    @property
+    def total(self) -> int:
+        return len(self.products)
+
+    def _add(self, product: tuple):
+        shop_id, status, model, price = product
+        self.status_counts[status] += 1
+        self.model_counts[model] += 1
+        self.shop_totals[shop_id] += 1
+        self.shop_models[shop_id][model] += 1
+        if status == 'in_stock':
+            self.shop_in_stock[shop_id] += 1
+        if not _is_missing(price):
+            insort(self.prices, price)
+            self.price_sum += price
+            self.shop_price_sum[shop_id] += price
+            self.shop_price_count[shop_id] += 1
+            if status == 'in_stock':
+                self.shop_stock_value[shop_id] += price
+
+    def _remove(self, product: tuple):
+        shop_id, status, model, price = product
+        _decrement(self.status_counts, status)
+        _decrement(self.model_counts, model)
+        _decrement(self.shop_totals, shop_id)
+        _decrement(self.shop_models[shop_id], model)
+        if not self.shop_models[shop_id]:
+            del self.shop_models[shop_id]
+        if status == 'in_stock':
+            _decrement(self.shop_in_stock, shop_id)
+        if not _is_missing(price):
+            del self.prices[bisect_left(self.prices, price)]
+            self.price_sum -= price
+            self.shop_price_sum[shop_id] -= price
+            _decrement(self.shop_price_count, shop_id)
+            if status == 'in_stock':
+                self.shop_stock_value[shop_id] -= price
+
+def load_aggregates(excel_path: str) -> InventoryAggregates:
+    """Read the products workbook and compute its aggregates (runs in a worker process)"""
+    aggregates = InventoryAggregates()
+    aggregates.build(load_products(excel_path))
+    return aggregates
+
+def _decrement(counter: Counter, key):
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
 
 class AnalyticsService:
     def __init__(self, excel_path: str = 'data/products.xlsx'):
         self.excel_path = excel_path
-    
+        self.snapshot = shared_snapshot(excel_path)
+        self.aggregates = InventoryAggregates()
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild aggregates from the shared snapshot (or the workbook)"""
+        self.aggregates.build(load_products(self.excel_path))
+        self._snapshot_version = self.snapshot.version
+
+    async def refresh_async(self):
+        """Rebuild aggregates in a worker process, keeping the event loop free"""
+        # Taken before the rebuild: if a version is published meanwhile, the next sync rebuilds again
+        version = self.snapshot.version
+        self.aggregates = await executor.run_cpu(load_aggregates, self.excel_path)
+        self._snapshot_version = version
+
+    async def sync(self):
+        """Rebuild when another process published a newer snapshot"""
+        if self.snapshot.version != self._snapshot_version and self.snapshot.is_current():
+            await self.refresh_async()
+
+    def mark_applied(self, version: Optional[int]):
+        """Record a version this process published and already applied incrementally.
+
+        Only the next version is taken, so a publish from another process in
+        between still triggers a rebuild.
+        """
+        if version is not None and version == self._snapshot_version + 1:
+            self._snapshot_version = version
+
+    def record_transfer(self, imei: str, to_shop: int) -> bool:
+        """Move a product to another shop in the aggregates"""
+        return self.aggregates.update(imei, shop_id=to_shop)
+
     def get_inventory_summary(self) -> Dict:
         """Get summary of current inventory"""
-        df = pd.read_excel(self.excel_path)
-        
-        total = len(df)
-        in_stock = len(df[df['Status'] == 'in_stock'])
-        
+        total = self.aggregates.total
+        in_stock = self.aggregates.status_counts['in_stock']
+
         return {
             'total_products': total,
             'in_stock': in_stock,
             'out_of_stock': total - in_stock,
             'stock_rate': round((in_stock / total * 100), 2) if total > 0 else 0
         }
-    
-    def get_shop_statistics(self) -> List[Dict]:
-        """Get statistics for each shop"""
-        df = pd.read_excel(self.excel_path)
+
+    def get_shop_statistics(self, extra_metrics: Sequence[str] = ()) -> List[Dict]:
+        """Get statistics for each shop.
+
+        `extra_metrics` may include 'stock_value' (price of in-stock units)
+        and 'average_price'.
+        """
+        aggregates = self.aggregates
         stats = []
         
-        for shop_id in df['Shop_ID'].unique():
-            shop_df = df[df['Shop_ID'] == shop_id]
-            stats.append({
+        for shop_id, total in aggregates.shop_totals.items():
+            shop = {
                 'shop_id': shop_id,
-                'total_products': len(shop_df),
-                'in_stock': len(shop_df[shop_df['Status'] == 'in_stock']),
-                'models': shop_df['Model'].nunique()
-            })
+                'total_products': total,
+                'in_stock': aggregates.shop_in_stock[shop_id],
+                'models': len(aggregates.shop_models[shop_id])
+            }
+            if 'stock_value' in extra_metrics:
+                shop['stock_value'] = round(aggregates.shop_stock_value[shop_id], 2)
+            if 'average_price' in extra_metrics:
+                count = aggregates.shop_price_count[shop_id]
+                shop['average_price'] = round(aggregates.shop_price_sum[shop_id] / count, 2) if count else math.nan
+            stats.append(shop)
         
         return stats
-    
+
     def get_model_distribution(self) -> Dict[str, int]:
         """Get distribution of products by model"""
-        df = pd.read_excel(self.excel_path)
-        return df['Model'].value_counts().to_dict()
-    
+        return dict(self.aggregates.model_counts.most_common())
+
     def get_price_analytics(self) -> Dict:
         """Get price statistics"""
-        df = pd.read_excel(self.excel_path)
-        prices = df['Price'].dropna()
-        
+        prices = self.aggregates.prices
+        if not prices:
+            return {
+                'average_price': math.nan,
+                'min_price': math.nan,
+                'max_price': math.nan,
+                'median_price': math.nan
+            }
+
+        middle = len(prices) // 2
+        median = prices[middle] if len(prices) % 2 else (prices[middle - 1] + prices[middle]) / 2
         return {
-            'average_price': round(prices.mean(), 2),
-            'min_price': prices.min(),
-            'max_price': prices.max(),
-            'median_price': prices.median()
-        }
\ No newline at end of file
+            'average_price': round(self.aggregates.price_sum / len(prices), 2),
+            'min_price': prices[0],
+            'max_price': prices[-1],
+            'median_price': median
+        }
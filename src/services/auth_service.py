@@ -1,13 +1,170 @@
 from passlib.context import CryptContext
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import FrozenSet, Optional, Tuple
+import asyncio
+import os
+import threading
+import time
 from jose import JWTError, jwt
 from src.config import settings
-from src.database.models import User
+from src.database.models import User, Role
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.orm import Session, object_session, selectinload
+from sqlalchemy import select, event, inspect
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop; the pool size caps how many run at once, the rest queue behind it
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash'
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """pwd_context.verify on the password pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.verify, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """pwd_context.hash on the password pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+
+# Resolved principals per token subject; TTL bounds staleness across processes
+PRINCIPAL_CACHE_TTL = float(os.getenv('PRINCIPAL_CACHE_TTL', '60'))
+PRINCIPAL_CACHE_SIZE = int(os.getenv('PRINCIPAL_CACHE_SIZE', '1024'))
+
+@dataclass(frozen=True)
+class Principal:
+    """An authenticated user with roles and permissions resolved once"""
+    user_id: int
+    username: str
+    telegram_id: Optional[int]
+    is_active: bool
+    roles: Tuple[str, ...]
+    permissions: FrozenSet[str]
+    all_permissions: bool
+    
+    @classmethod
+    def from_user(cls, user: User) -> 'Principal':
+        permissions = set()
+        for role in user.roles:
+            permissions.update(p.strip() for p in (role.permissions or '').split(',') if p.strip())
+        return cls(
+            user_id=user.id,
+            username=user.username,
+            telegram_id=user.telegram_id,
+            is_active=bool(user.is_active),
+            roles=tuple(role.name for role in user.roles),
+            permissions=frozenset(permissions),
+            # Only a role whose permissions are exactly 'all' grants everything
+            all_permissions=any(role.permissions == 'all' for role in user.roles)
+        )
+    
+    def has_permission(self, permission: str) -> bool:
+        return self.all_permissions or permission in self.permissions
+
+class PrincipalCache:
+    """LRU cache of principals by username, with per-entry expiry"""
+    
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL, max_size: int = PRINCIPAL_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, username: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[username]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.username] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, username: Optional[str] = None):
+        """Drop one user's entry, or every entry when no username is given"""
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(username, None)
+
+principal_cache = PrincipalCache()
+
+# ORM changes to users or roles invalidate cached principals once they are
+# committed, so a concurrent request cannot re-cache the old row for a whole
+# TTL and a rollback evicts nothing. Core/bulk statements bypass these events
+# and are covered by the TTL only.
+_PENDING_INVALIDATIONS = 'principal_invalidations'
+
+def _invalidate_on_commit(target, username: Optional[str]):
+    """Evict `username` (every principal when None) after target's session commits"""
+    session = object_session(target)
+    if session is None:
+        principal_cache.invalidate(username)
+    else:
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).add(username)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user(mapper, connection, user):
+    _invalidate_on_commit(user, user.username)
+    for old_username in inspect(user).attrs.username.history.deleted or ():
+        _invalidate_on_commit(user, old_username)
+
+@event.listens_for(User.roles, 'append')
+@event.listens_for(User.roles, 'remove')
+def _invalidate_user_roles(user, role, initiator):
+    _invalidate_on_commit(user, user.username)
+
+@event.listens_for(Role, 'after_update')
+@event.listens_for(Role, 'after_delete')
+def _invalidate_role(mapper, connection, role):
+    _invalidate_on_commit(role, None)
+
+@event.listens_for(Session, 'after_commit')
+def _evict_committed(session):
+    usernames = session.info.pop(_PENDING_INVALIDATIONS, ())
+    if None in usernames:
+        principal_cache.invalidate()
+    else:
+        for username in usernames:
+            principal_cache.invalidate(username)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+
+async def load_principal(session: AsyncSession, username: str) -> Optional[Principal]:
+    """Resolve a username to an active principal, from the cache when fresh"""
+    principal = principal_cache.get(username)
+    if principal is None:
+        stmt = select(User).options(selectinload(User.roles)).where(User.username == username)
+        result = await session.execute(stmt)
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.put(principal)
+    return principal if principal.is_active else None
+
 class AuthService:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -18,12 +175,18 @@ class AuthService:
     def get_password_hash(self, password: str) -> str:
         return pwd_context.hash(password)
     
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await verify_password_async(plain_password, hashed_password)
+    
+    async def get_password_hash_async(self, password: str) -> str:
+        return await hash_password_async(password)
+    
     async def authenticate_user(self, username: str, password: str) -> User | None:
         stmt = select(User).where(User.username == username)
         result = await self.session.execute(stmt)
         user = result.scalar_one_or_none()
         
-        if not user or not self.verify_password(password, user.password_hash):
+        if not user or not await self.verify_password_async(password, user.password_hash):
             return None
         return user
     
@@ -36,14 +199,24 @@ class AuthService:
         to_encode.update({"exp": expire})
         return jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     
-    async def get_current_user(self, token: str) -> User | None:
+    def _token_subject(self, token: str) -> str | None:
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-            username: str = payload.get("sub")
-            if username is None:
-                return None
         except JWTError:
             return None
+        return payload.get("sub")
+    
+    async def get_principal(self, token: str) -> Principal | None:
+        """Resolve a token to its principal without a query while it is cached"""
+        username = self._token_subject(token)
+        if username is None:
+            return None
+        return await load_principal(self.session, username)
+    
+    async def get_current_user(self, token: str) -> User | None:
+        username = self._token_subject(token)
+        if username is None:
+            return None
         
         stmt = select(User).where(User.username == username)
         result = await self.session.execute(stmt)
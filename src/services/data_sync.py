@@ -1,47 +1,104 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import math
+import time
 import pandas as pd
-from sqlalchemy import select
+from datetime import datetime
+from sqlalchemy import select, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from database.models import Product, Shop
-from utils.logger import logger
+from src.database.models import Product, Shop
+from src.utils.logger import logger
+from src.utils.snapshot import read_excel_cached
+from src.utils.search_index import index_key
+from src.services.product_service import search_cache
+from src.utils.executor import executor
+
+SYNC_CHUNK_SIZE = 1000
+SYNC_FIELDS = ['model', 'ram', 'storage', 'network', 'price', 'condition', 'status', 'shop_id']
 
 class DataSyncService:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, chunk_size: int = SYNC_CHUNK_SIZE):
         self.session = session
-    
-    async def sync_from_excel(self, file_path: str = 'data/products.xlsx'):
-        """Sync database with Excel data"""
+        self.chunk_size = chunk_size
+
+    async def sync_from_excel(self, file_path: str = 'data/products.xlsx') -> Dict:
+        """Sync database with Excel data in bulk.
+
+        Existing products are loaded in one query and diffed in memory, so
+        only new and changed rows are written, in chunked executemany batches.
+        """
         try:
-            df = pd.read_excel(file_path)
-            products = df.to_dict('records')
-            
-            async with self.session.begin():
-                for product_data in products:
-                    product = await self._get_or_create_product(product_data)
-                    await self._update_product(product, product_data)
-            
-            logger.info(f"Successfully synced {len(products)} products from Excel")
+            started = time.perf_counter()
+            df = await executor.run_io(read_excel_cached, file_path)
+            rows = {}
+            for data in df.to_dict('records'):
+                values = self._product_values(data)
+                rows[values['imei']] = values
+            read_done = time.perf_counter()
+
+            stmt = select(Product.id, Product.imei, *[getattr(Product, f) for f in SYNC_FIELDS])
+            result = await self.session.execute(stmt)
+            existing = {row.imei: row for row in result}
+
+            inserts, updates = [], []
+            for imei, values in rows.items():
+                current = existing.get(imei)
+                if current is None:
+                    inserts.append(values)
+                elif any(getattr(current, f) != values[f] for f in SYNC_FIELDS):
+                    updates.append({'id': current.id, 'updated_at': datetime.utcnow(), **values})
+            diff_done = time.perf_counter()
+
+            for chunk in self._chunks(inserts):
+                await self.session.execute(insert(Product), chunk)
+            for chunk in self._chunks(updates):
+                await self.session.execute(update(Product), chunk)
+            # The caller's session may already be in a transaction (db.session()
+            # checks out its connection up front), so commit it rather than begin()
+            await self.session.commit()
+            write_done = time.perf_counter()
+            if inserts or updates:
+                search_cache.bump()
+
+            report = {
+                'total': len(rows),
+                'inserted': len(inserts),
+                'updated': len(updates),
+                'unchanged': len(rows) - len(inserts) - len(updates),
+                'read_seconds': round(read_done - started, 3),
+                'diff_seconds': round(diff_done - read_done, 3),
+                'write_seconds': round(write_done - diff_done, 3)
+            }
+            logger.info(
+                f"Synced {report['total']} products from Excel: "
+                f"{report['inserted']} inserted, {report['updated']} updated, "
+                f"{report['unchanged']} unchanged in {write_done - started:.2f}s"
+            )
+            return report
         except Exception as e:
+            await self.session.rollback()
             logger.error(f"Error syncing data: {str(e)}")
             raise
-    
-    async def _get_or_create_product(self, data: Dict) -> Product:
-        stmt = select(Product).where(Product.imei == data['IMEI'])
-        result = await self.session.execute(stmt)
-        product = result.scalar_one_or_none()
-        
-        if not product:
-            product = Product(imei=data['IMEI'])
-            self.session.add(product)
-        
-        return product
-    
-    async def _update_product(self, product: Product, data: Dict):
-        product.model = data['Model']
-        product.ram = data.get('RAM')
-        product.storage = data.get('Storage')
-        product.network = data.get('Network')
-        product.price = float(data['Price'])
-        product.condition = data.get('Condition', 'new')
-        product.status = data.get('Status', 'in_stock')
-        product.shop_id = int(data.get('Shop_ID', 1))
\ No newline at end of file
+
+    def _chunks(self, rows: List[Dict]):
+        for start in range(0, len(rows), self.chunk_size):
+            yield rows[start:start + self.chunk_size]
+
+    def _product_values(self, data: Dict) -> Dict:
+        return {
+            'imei': index_key(data['IMEI']),
+            'model': data['Model'],
+            'ram': self._clean(data.get('RAM')),
+            'storage': self._clean(data.get('Storage')),
+            'network': self._clean(data.get('Network')),
+            'price': float(data['Price']),
+            'condition': self._clean(data.get('Condition')) or 'new',
+            'status': self._clean(data.get('Status')) or 'in_stock',
+            'shop_id': int(self._clean(data.get('Shop_ID')) or 1)
+        }
+
+    @staticmethod
+    def _clean(value) -> Optional[object]:
+        """Map Excel's empty cells (NaN) to None"""
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return value
@@ -1,61 +1,264 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, text, column, table, literal_column, or_
 from src.database.models import Product
+from src.database.database import current_session
+from src.database.fts import FTS_TABLE, FTS_MIN_QUERY_LENGTH, match_expression
+import hashlib
+import json
+import math
+import time
 import pandas as pd
-from typing import List, Dict
+from datetime import datetime
+from typing import AsyncIterator, List, Dict, Optional, Sequence, Tuple
 from src.config import settings
+from src.utils.snapshot import read_excel_cached
+from src.utils.query_cache import QueryCache, normalize_query
+from src.utils.search_index import index_key
+from src.utils.executor import executor
+from src.utils.query_language import compile_sql, is_plain, parse_query
+
+# Excel column -> Product attribute kept in sync (and covered by row_hash)
+SYNC_COLUMNS = {
+    'Model': 'model',
+    'RAM': 'ram',
+    'Storage': 'storage',
+    'Network': 'network',
+    'Price': 'price',
+    'Condition': 'condition',
+    'Status': 'status',
+    'Shop_ID': 'shop_id'
+}
+SYNC_CHUNK_SIZE = 1000
+
+# Columns the listing endpoints may project; the default listing returns all of them
+LISTING_FIELDS = [
+    'id', 'imei', 'model', 'ram', 'storage', 'network', 'price',
+    'condition', 'status', 'shop_id', 'created_at', 'updated_at'
+]
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+products_fts = table(FTS_TABLE, column('rowid'))
+
+# Query language field -> Product column
+QUERY_COLUMNS = {
+    'model': Product.model,
+    'ram': Product.ram,
+    'storage': Product.storage,
+    'network': Product.network,
+    'condition': Product.condition,
+    'status': Product.status,
+    'imei': Product.imei,
+    'price': Product.price,
+    'shop': Product.shop_id
+}
+
+# Engine URL -> True once the products_fts table was found there; a miss is
+# re-checked after FTS_RECHECK_SECONDS so a migration applied later is picked up
+_fts_available: Dict[str, bool] = {}
+_fts_checked_at: Dict[str, float] = {}
+FTS_RECHECK_SECONDS = 60
+
+# (engine URL, normalized query) -> matching product ids, in result order
+search_cache = QueryCache()
 
 class ProductService:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+    def __init__(self, session: Optional[AsyncSession] = None):
+        self._session = session
+    
+    @property
+    def session(self) -> AsyncSession:
+        """The bound session, or the one scoped to the current Telegram update"""
+        session = self._session or current_session.get()
+        if session is None:
+            raise RuntimeError("ProductService used outside a database session scope")
+        return session
     
     async def get_all_products(self) -> List[Product]:
         stmt = select(Product)
         result = await self.session.execute(stmt)
         return result.scalars().all()
     
+    async def list_products(self, after_id: int = 0, limit: int = DEFAULT_PAGE_SIZE,
+                            fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict], Optional[int]]:
+        """One keyset page of products ordered by id.
+
+        Returns the rows (projected to `fields`) and the cursor for the next
+        page, or None when this was the last one.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        columns = listing_columns(fields)
+        stmt = select(*columns).where(Product.id > after_id).order_by(Product.id).limit(limit)
+        result = await self.session.execute(stmt)
+        rows = [dict(row._mapping) for row in result]
+        next_after_id = rows[-1]['id'] if len(rows) == limit else None
+        if fields and 'id' not in fields:
+            for row in rows:
+                del row['id']
+        return rows, next_after_id
+    
+    async def iter_products(self, fields: Optional[Sequence[str]] = None,
+                            batch_size: int = MAX_PAGE_SIZE) -> AsyncIterator[Dict]:
+        """Yield every product page by page, holding one page in memory at a time"""
+        after_id = 0
+        while after_id is not None:
+            rows, after_id = await self.list_products(after_id, batch_size, fields)
+            for row in rows:
+                yield row
+    
     async def search_products(self, query: str) -> List[Product]:
-        query = query.lower()
-        stmt = select(Product).where(
-            (Product.model.ilike(f"%{query}%")) |
-            (Product.ram.ilike(f"%{query}%")) |
-            (Product.network.ilike(f"%{query}%")) |
-            (Product.storage.ilike(f"%{query}%"))
-        )
+        """Search model/RAM/storage/network, via FTS5 when the index exists.
+
+        Structured queries such as 'ram:8gb network:5g -status:sold' are
+        compiled to SQL. Matching ids are cached per normalized query until
+        the next sync.
+        """
+        query = normalize_query(query)
+        key = (str(self.session.get_bind().url), query)
+        ids = search_cache.get(key)
+        if ids is not None:
+            return await self._products_by_ids(ids)
+        
+        version = search_cache.version
+        tree = parse_query(query)
+        has_fts = await self._has_fts()
+        if not is_plain(tree, query):
+            # Fields, AND/OR, negation and phrases compile to one WHERE clause; no
+            # ORDER BY, which would tempt SQLite into a rowid scan over the indexes
+            stmt = select(Product).where(
+                compile_sql(tree, QUERY_COLUMNS, lambda term: _text_clause(term, has_fts))
+            )
+        elif len(query) >= FTS_MIN_QUERY_LENGTH and has_fts:
+            stmt = (
+                select(Product)
+                .join(products_fts, products_fts.c.rowid == Product.id)
+                .where(text(f"{FTS_TABLE} MATCH :match"))
+                .order_by(text(f"bm25({FTS_TABLE})"))
+                .params(match=match_expression(query))
+            )
+        else:
+            stmt = select(Product).where(_text_clause(query, False))
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        products = result.scalars().all()
+        search_cache.put(key, [product.id for product in products], version)
+        return products
+    
+    async def _products_by_ids(self, ids: List[int]) -> List[Product]:
+        """Load products by primary key, keeping the order of `ids`"""
+        found = {}
+        for start in range(0, len(ids), SYNC_CHUNK_SIZE):
+            stmt = select(Product).where(Product.id.in_(ids[start:start + SYNC_CHUNK_SIZE]))
+            result = await self.session.execute(stmt)
+            found.update((product.id, product) for product in result.scalars())
+        return [found[product_id] for product_id in ids if product_id in found]
+    
+    async def _has_fts(self) -> bool:
+        bind = self.session.get_bind()
+        key = str(bind.url)
+        if _fts_available.get(key) or bind.dialect.name != 'sqlite':
+            return _fts_available.get(key, False)
+        if time.monotonic() - _fts_checked_at.get(key, -math.inf) >= FTS_RECHECK_SECONDS:
+            result = await self.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': FTS_TABLE}
+            )
+            _fts_available[key] = result.first() is not None
+            _fts_checked_at[key] = time.monotonic()
+        return _fts_available[key]
     
-    async def sync_from_excel(self):
+    async def sync_from_excel(self, mark_missing: bool = False) -> Dict:
+        """Sync products from Excel, skipping rows whose content hash is unchanged.
+
+        Products that are no longer in the sheet are counted, and flagged
+        with status 'missing' when `mark_missing` is set.
+        """
         try:
-            df = pd.read_excel(settings.EXCEL_FILE_PATH)
-            products = df.to_dict('records')
+            df = await executor.run_io(read_excel_cached, settings.EXCEL_FILE_PATH)
+            columns = {col: attr for col, attr in SYNC_COLUMNS.items() if col in df.columns}
+            
+            result = await self.session.execute(
+                select(Product.id, Product.imei, Product.row_hash, Product.status)
+            )
+            # Keyed like the sheet rows, so 123, 123.0 and '123' compare equal
+            existing = {index_key(row.imei): row for row in result}
             
-            for product_data in products:
-                stmt = select(Product).where(Product.imei == str(product_data['IMEI']))
-                result = await self.session.execute(stmt)
-                product = result.scalar_one_or_none()
+            inserts, changes, seen = [], [], set()
+            for product_data in df.to_dict('records'):
+                imei = index_key(product_data['IMEI'])
+                values = {attr: _clean(product_data[col]) for col, attr in columns.items()}
+                values['row_hash'] = _row_hash(values)
+                seen.add(imei)
                 
-                if product:
-                    # Update existing product
-                    for key, value in product_data.items():
-                        if hasattr(product, key.lower()):
-                            setattr(product, key.lower(), value)
-                else:
-                    # Create new product
-                    new_product = Product(
-                        imei=str(product_data['IMEI']),
-                        model=product_data['Model'],
-                        ram=product_data.get('RAM', ''),
-                        storage=product_data.get('Storage', ''),
-                        network=product_data.get('Network', ''),
-                        price=float(product_data['Price']),
-                        condition=product_data.get('Condition', 'new'),
-                        status=product_data.get('Status', 'in_stock')
-                    )
-                    self.session.add(new_product)
+                product = existing.get(imei)
+                if product is None:
+                    inserts.append({
+                        'imei': imei,
+                        **values,
+                        'condition': values.get('condition') or 'new',
+                        'status': values.get('status') or 'in_stock'
+                    })
+                elif product.row_hash != values['row_hash']:
+                    changes.append({'id': product.id, 'updated_at': datetime.utcnow(), **values})
+            
+            missing = [row for imei, row in existing.items() if imei not in seen]
+            updates = list(changes)
+            if mark_missing:
+                # Clearing the hash makes a product that reappears sync again; rows
+                # already flagged are left alone so their updated_at stays put
+                updates.extend(
+                    {'id': row.id, 'status': 'missing', 'row_hash': None}
+                    for row in missing if row.status != 'missing'
+                )
+            
+            for start in range(0, len(inserts), SYNC_CHUNK_SIZE):
+                await self.session.execute(insert(Product), inserts[start:start + SYNC_CHUNK_SIZE])
+            for start in range(0, len(updates), SYNC_CHUNK_SIZE):
+                await self.session.execute(update(Product), updates[start:start + SYNC_CHUNK_SIZE])
             
             await self.session.commit()
-            return True
+            if inserts or updates:
+                search_cache.bump()
+            return {
+                'inserted': len(inserts),
+                'updated': len(changes),
+                'unchanged': len(seen) - len(inserts) - len(changes),
+                'missing': len(missing)
+            }
         except Exception as e:
             await self.session.rollback()
-            raise e
\ No newline at end of file
+            raise e
+
+def listing_columns(fields: Optional[Sequence[str]] = None) -> list:
+    """Product columns for a listing projection, always led by the id cursor"""
+    fields = list(fields or LISTING_FIELDS)
+    unknown = [f for f in fields if f not in LISTING_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown product fields: {', '.join(unknown)}")
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return [getattr(Product, f) for f in fields]
+
+def _text_clause(term: str, has_fts: bool):
+    """Products whose model/RAM/storage/network contain `term`"""
+    if has_fts and len(term) >= FTS_MIN_QUERY_LENGTH:
+        return Product.id.in_(
+            select(products_fts.c.rowid).where(
+                literal_column(FTS_TABLE).op('MATCH')(match_expression(term))
+            )
+        )
+    return or_(
+        Product.model.ilike(f"%{term}%"),
+        Product.ram.ilike(f"%{term}%"),
+        Product.network.ilike(f"%{term}%"),
+        Product.storage.ilike(f"%{term}%")
+    )
+
+def _clean(value):
+    """Map Excel's empty cells (NaN) to None"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def _row_hash(values: Dict) -> str:
+    payload = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
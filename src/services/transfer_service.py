@@ -1,16 +1,30 @@
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+import os
+import threading
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from src.utils.snapshot import read_excel_cached, write_excel_cached
+from src.utils.shared_snapshot import load_products, publish_products, shared_snapshot
+from src.utils.search_index import index_key, position_index
+from src.services.analytics_service import AnalyticsService
 
 class TransferService:
-    def __init__(self, excel_path: str = 'data/products.xlsx'):
+    def __init__(self, excel_path: str = 'data/products.xlsx',
+                 analytics: Optional[AnalyticsService] = None):
         self.excel_path = excel_path
+        self.analytics = analytics
         self.transfers_df = self._load_transfers()
+        self._products_df = None
+        self._products_mtime = None
+        self._imei_positions: Dict[str, int] = {}
+        # Transfers run on executor threads; one at a time keeps IDs and workbooks consistent
+        self._lock = threading.Lock()
     
     def _load_transfers(self) -> pd.DataFrame:
         """Load or create transfers tracking DataFrame"""
         try:
-            return pd.read_excel('data/transfers.xlsx')
+            return read_excel_cached('data/transfers.xlsx')
         except FileNotFoundError:
             df = pd.DataFrame(columns=[
                 'ID', 'Product_IMEI', 'From_Shop', 'To_Shop',
@@ -20,18 +34,45 @@ class TransferService:
             df.to_excel('data/transfers.xlsx', index=False)
             return df
     
+    def _load_products(self) -> pd.DataFrame:
+        """Load products, reusing the mapped snapshot while the workbook is unchanged.
+
+        The frame is shared with other processes and must not be modified.
+        """
+        mtime = os.stat(self.excel_path).st_mtime_ns
+        if self._products_df is None or mtime != self._products_mtime:
+            self._products_df = load_products(self.excel_path)
+            self._imei_positions = position_index(self._products_df['IMEI'])
+            self._products_mtime = mtime
+        return self._products_df
+    
+    def _save_products(self, products_df: pd.DataFrame) -> Optional[int]:
+        """Write products back, publish them and switch to the published copy.
+
+        Returns the published snapshot version, or None if publishing failed.
+        """
+        write_excel_cached(products_df, self.excel_path)
+        published = publish_products(self.excel_path, products_df)
+        # Rows keep their positions, so the IMEI index stays valid
+        self._products_df = shared_snapshot(self.excel_path).frame() if published else products_df
+        self._products_mtime = os.stat(self.excel_path).st_mtime_ns
+        return published
+    
     def transfer_product(self, product_imei: str, from_shop: int, 
                         to_shop: int, initiated_by: int) -> Tuple[bool, str]:
         """Process a product transfer between shops"""
+        with self._lock:
+            return self._transfer_product(product_imei, from_shop, to_shop, initiated_by)
+    
+    def _transfer_product(self, product_imei: str, from_shop: int,
+                          to_shop: int, initiated_by: int) -> Tuple[bool, str]:
         try:
             # Load current product data
-            products_df = pd.read_excel(self.excel_path)
+            products_df = self._load_products()
             
             # Verify product exists and is in source shop
-            product_mask = (products_df['IMEI'] == product_imei) & \
-                         (products_df['Shop_ID'] == from_shop)
-            
-            if not product_mask.any():
+            position = self._imei_positions.get(index_key(product_imei))
+            if position is None or products_df.at[position, 'Shop_ID'] != from_shop:
                 return False, "Product not found in source shop"
             
             # Create transfer record
@@ -48,22 +89,90 @@ class TransferService:
                 'Notes': f'Transfer from Shop {from_shop} to Shop {to_shop}'
             }
             
-            # Update product location
-            products_df.loc[product_mask, 'Shop_ID'] = to_shop
+            # Update product location on a private copy of the shared frame
+            products_df = products_df.copy()
+            products_df.at[position, 'Shop_ID'] = to_shop
             
             # Save changes
-            products_df.to_excel(self.excel_path, index=False)
+            version = self._save_products(products_df)
             self.transfers_df = pd.concat([
                 self.transfers_df,
                 pd.DataFrame([transfer_record])
             ], ignore_index=True)
-            self.transfers_df.to_excel('data/transfers.xlsx', index=False)
+            write_excel_cached(self.transfers_df, 'data/transfers.xlsx')
+            
+            if self.analytics:
+                self.analytics.record_transfer(product_imei, to_shop)
+                self.analytics.mark_applied(version)
             
             return True, f"Product transferred successfully from Shop {from_shop} to Shop {to_shop}"
             
         except Exception as e:
+            self._products_df = None  # reload from disk on the next call
             return False, f"Transfer failed: {str(e)}"
     
+    def transfer_many(self, product_imeis: List[str], from_shop: int,
+                      to_shop: int, initiated_by: int) -> Tuple[bool, str]:
+        """Transfer a batch of products between shops in a single commit.
+
+        Either every IMEI is in the source shop and the whole batch moves,
+        or nothing is changed.
+        """
+        with self._lock:
+            return self._transfer_many(product_imeis, from_shop, to_shop, initiated_by)
+    
+    def _transfer_many(self, product_imeis: List[str], from_shop: int,
+                       to_shop: int, initiated_by: int) -> Tuple[bool, str]:
+        try:
+            products_df = self._load_products()
+            imeis = list(dict.fromkeys(index_key(imei) for imei in product_imeis))
+            if not imeis:
+                return False, "No products given"
+            
+            # Validate the whole batch at once
+            positions = np.array([self._imei_positions.get(imei, -1) for imei in imeis])
+            found = positions >= 0
+            valid = found.copy()
+            valid[found] = products_df['Shop_ID'].to_numpy()[positions[found]] == from_shop
+            
+            if not valid.all():
+                missing = [imei for imei, ok in zip(imeis, valid) if not ok]
+                shown = ', '.join(missing[:10]) + (' ...' if len(missing) > 10 else '')
+                return False, f"{len(missing)} products not found in source shop: {shown}"
+            
+            # Create transfer records
+            now = datetime.now().isoformat()
+            first_id = len(self.transfers_df) + 1
+            transfer_records = pd.DataFrame({
+                'ID': range(first_id, first_id + len(imeis)),
+                'Product_IMEI': imeis,
+                'From_Shop': from_shop,
+                'To_Shop': to_shop,
+                'Status': 'completed',
+                'Initiated_By': initiated_by,
+                'Transfer_Date': now,
+                'Completed_Date': now,
+                'Notes': f'Batch transfer from Shop {from_shop} to Shop {to_shop}'
+            })
+            
+            # Update product locations and save both workbooks once
+            products_df = products_df.copy()
+            products_df.loc[positions, 'Shop_ID'] = to_shop
+            version = self._save_products(products_df)
+            self.transfers_df = pd.concat([self.transfers_df, transfer_records], ignore_index=True)
+            write_excel_cached(self.transfers_df, 'data/transfers.xlsx')
+            
+            if self.analytics:
+                for imei in imeis:
+                    self.analytics.record_transfer(imei, to_shop)
+                self.analytics.mark_applied(version)
+            
+            return True, f"{len(imeis)} products transferred successfully from Shop {from_shop} to Shop {to_shop}"
+            
+        except Exception as e:
+            self._products_df = None  # reload from disk on the next call
+            return False, f"Batch transfer failed: {str(e)}"
+    
     def get_transfer_history(self, product_imei: Optional[str] = None,
                            shop_id: Optional[int] = None) -> pd.DataFrame:
         """Get transfer history with optional filters"""
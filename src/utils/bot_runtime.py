@@ -0,0 +1,119 @@
+from typing import Any, Awaitable, Dict, Optional
+import asyncio
+import os
+import sys
+from telegram import Update
+from telegram.ext import Application, BaseUpdateProcessor
+from .logger import setup_logger
+
+logger = setup_logger()
+
+# polling | webhook
+BOT_MODE = os.getenv('BOT_MODE', 'polling').lower()
+BOT_CONCURRENCY = int(os.getenv('BOT_CONCURRENCY', '16'))
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')  # public base URL, e.g. https://bot.example.com
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', '8443'))
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+WEBHOOK_PATH = '/telegram'
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Process up to `max_concurrent_updates` updates at once, one at a time per chat.
+
+    Updates from different chats run concurrently; updates from the same chat
+    (or the same user, for chat-less updates like inline queries) keep their
+    arrival order. An update only takes one of the concurrency slots once it is
+    at the head of its chat's queue, so a busy chat cannot starve the others.
+    """
+
+    def __init__(self, max_concurrent_updates: int = BOT_CONCURRENCY):
+        super().__init__(max_concurrent_updates)
+        # PTB takes `_semaphore` before calling do_process_update, i.e. before the
+        # per-chat lock; leave it unbounded and take a slot once the chat's turn comes
+        self._semaphore = asyncio.BoundedSemaphore(sys.maxsize)
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        self._locks: Dict[Any, asyncio.Lock] = {}
+        self._waiters: Dict[Any, int] = {}
+
+    @staticmethod
+    def _key(update: object) -> Optional[Any]:
+        if isinstance(update, Update):
+            if update.effective_chat:
+                return ('chat', update.effective_chat.id)
+            if update.effective_user:
+                return ('user', update.effective_user.id)
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self._key(update)
+        if key is None:
+            async with self._slots:
+                await coroutine
+            return
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            async with lock, self._slots:
+                await coroutine
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                del self._locks[key]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+def create_webhook_app(application: Application, secret: str = WEBHOOK_SECRET):
+    """Starlette app that feeds Telegram webhook posts into the update queue"""
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import PlainTextResponse, Response
+    from starlette.routing import Route
+
+    async def telegram(request: Request) -> Response:
+        if secret and request.headers.get('X-Telegram-Bot-Api-Secret-Token') != secret:
+            return Response(status_code=403)
+        await application.update_queue.put(Update.de_json(await request.json(), application.bot))
+        return Response()
+
+    async def health(_: Request) -> PlainTextResponse:
+        return PlainTextResponse(f"ok, {application.update_queue.qsize()} updates queued")
+
+    return Starlette(routes=[
+        Route(WEBHOOK_PATH, telegram, methods=['POST']),
+        Route('/healthcheck', health, methods=['GET']),
+    ])
+
+async def run_application(application: Application, mode: str = BOT_MODE):
+    """Run the bot until cancelled, receiving updates by polling or webhook"""
+    async with application:
+        await application.start()
+        try:
+            if mode == 'webhook':
+                import uvicorn
+                if not WEBHOOK_URL:
+                    raise ValueError("WEBHOOK_URL is required when BOT_MODE=webhook")
+                await application.bot.set_webhook(
+                    url=f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+                    secret_token=WEBHOOK_SECRET or None,
+                    allowed_updates=Update.ALL_TYPES
+                )
+                server = uvicorn.Server(uvicorn.Config(
+                    create_webhook_app(application),
+                    host=WEBHOOK_LISTEN, port=WEBHOOK_PORT, use_colors=False
+                ))
+                logger.info(f"Serving webhook on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+                await server.serve()
+            else:
+                await application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
+                logger.info("Polling for updates")
+                await asyncio.Event().wait()
+        finally:
+            if application.updater and application.updater.running:
+                await application.updater.stop()
+            await application.stop()
@@ -1,40 +1,95 @@
+import threading
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Optional
 from datetime import datetime
-from .exceptions import DataError, ProductNotFoundError
+from .exceptions import DataError, ProductNotFoundError, QuerySyntaxError
 from .validators import DataValidator
 from .logger import setup_logger
+from .snapshot import write_excel_cached
+from .shared_snapshot import shared_snapshot, load_products, publish_products
+from .search_index import InvertedIndex
+from .query_cache import QueryCache, normalize_query
+from .query_language import compile_mask, is_plain, parse_query
 
 logger = setup_logger()
 
+SEARCH_FIELDS = ['Model', 'RAM', 'Storage', 'Network', 'Color']
+
+# Query language field -> workbook column
+QUERY_COLUMNS = {
+    'model': 'Model',
+    'brand': 'Brand',
+    'ram': 'RAM',
+    'storage': 'Storage',
+    'network': 'Network',
+    'color': 'Color',
+    'condition': 'Condition',
+    'status': 'Status',
+    'imei': 'IMEI',
+    'price': 'Price',
+    'stock': 'Stock',
+    'shop': 'Shop_ID'
+}
+
 class DataManager:
     def __init__(self, excel_path: str = 'data/products.xlsx'):
         self.excel_path = excel_path
+        self.index = InvertedIndex(SEARCH_FIELDS)
+        self.search_cache = QueryCache()
+        self.snapshot = shared_snapshot(excel_path)
+        # Handlers call in from executor threads; writes must not interleave with reads
+        self._lock = threading.RLock()
         try:
-            self.df = pd.read_excel(excel_path)
+            self._load()
             logger.info(f"Loaded {len(self.df)} products from {excel_path}")
         except Exception as e:
             logger.error(f"Failed to load Excel file: {str(e)}")
             raise DataError(f"Could not load data: {str(e)}")
 
     def search_products(self, query: str) -> List[Dict]:
-        """Search products by any field"""
+        """Search products by model, RAM, storage, network or color"""
         try:
-            query = DataValidator.validate_query(query)
-            df_lower = self.df.astype(str).apply(lambda x: x.str.lower())
-            mask = df_lower.apply(lambda x: x.str.contains(query, na=False)).any(axis=1)
-            results = self.df[mask].to_dict('records')
+            with self._lock:
+                positions = self.search_positions(query)
+                results = self.df.iloc[positions].to_dict('records')
             logger.info(f"Found {len(results)} products matching '{query}'")
             return results
+        except QuerySyntaxError:
+            raise
         except Exception as e:
             logger.error(f"Search failed: {str(e)}")
             raise DataError(f"Search failed: {str(e)}")
 
+    def search_positions(self, query: str) -> np.ndarray:
+        """Row positions in `df` matching `query`, cached until the data changes.
+
+        Plain words use the text index directly; queries with fields, AND/OR,
+        negation or quoted phrases are compiled to a mask over `df`.
+        """
+        query = normalize_query(DataValidator.validate_query(query))
+        with self._lock:
+            self._sync()
+            return self.search_cache.get_or_compute(query, lambda: self._match(query))
+
+    def _match(self, query: str) -> np.ndarray:
+        tree = parse_query(query)
+        if is_plain(tree, query):
+            return self.index.search(query)
+        return np.flatnonzero(compile_mask(tree, self.df, QUERY_COLUMNS, self._text_mask))
+
+    def _text_mask(self, text: str) -> np.ndarray:
+        mask = np.zeros(len(self.df), dtype=bool)
+        mask[self.index.search(text)] = True
+        return mask
+
     def get_product_by_id(self, product_id: int) -> Dict:
         """Get product by ID"""
         try:
             product_id = DataValidator.validate_product_id(product_id)
-            product = self.df[self.df['ID'] == product_id]
+            with self._lock:
+                self._sync()
+                product = self.df[self.df['ID'] == product_id]
             if product.empty:
                 raise ProductNotFoundError(f"Product with ID {product_id} not found")
             return product.to_dict('records')[0]
@@ -50,13 +105,21 @@ class DataManager:
             product_id = DataValidator.validate_product_id(product_id)
             new_stock = DataValidator.validate_stock_update(new_stock)
             
-            mask = self.df['ID'] == product_id
-            if not mask.any():
-                raise ProductNotFoundError(f"Product with ID {product_id} not found")
-            
-            self.df.loc[mask, 'Stock'] = new_stock
-            self.df.loc[mask, 'LastUpdated'] = datetime.now().isoformat()
-            self.df.to_excel(self.excel_path, index=False)
+            with self._lock:
+                self._sync()
+                mask = self.df['ID'] == product_id
+                if not mask.any():
+                    raise ProductNotFoundError(f"Product with ID {product_id} not found")
+                
+                # The loaded frame is the shared read-only snapshot; edit a copy
+                df = self.df.copy()
+                df.loc[mask, 'Stock'] = new_stock
+                df.loc[mask, 'LastUpdated'] = datetime.now().isoformat()
+                write_excel_cached(df, self.excel_path)
+                if publish_products(self.excel_path, df):
+                    self._load()
+                else:
+                    self._load(df)
             
             logger.info(f"Updated stock for product {product_id} to {new_stock}")
             return True
@@ -68,7 +131,9 @@ class DataManager:
         """Get products with low stock"""
         try:
             threshold = DataValidator.validate_stock_update(threshold)
-            low_stock = self.df[self.df['Stock'] <= threshold]
+            with self._lock:
+                self._sync()
+                low_stock = self.df[self.df['Stock'] <= threshold]
             logger.info(f"Found {len(low_stock)} products with stock <= {threshold}")
             return low_stock.to_dict('records')
         except Exception as e:
@@ -78,8 +143,21 @@ class DataManager:
     def refresh_data(self):
         """Reload data from Excel file"""
         try:
-            self.df = pd.read_excel(self.excel_path)
+            with self._lock:
+                self._load()
             logger.info(f"Refreshed data from {self.excel_path}")
         except Exception as e:
             logger.error(f"Failed to refresh data: {str(e)}")
-            raise DataError(f"Failed to refresh data: {str(e)}")
\ No newline at end of file
+            raise DataError(f"Failed to refresh data: {str(e)}")
+
+    def _load(self, df: Optional[pd.DataFrame] = None):
+        """Switch to `df`, or to the current shared snapshot, and rebuild the index"""
+        self.df = load_products(self.excel_path) if df is None else df
+        self._snapshot_version = self.snapshot.version
+        self.index.build(self.df)
+        self.search_cache.bump()
+
+    def _sync(self):
+        """Pick up a snapshot published by another process (e.g. after a transfer)"""
+        if self.snapshot.version != self._snapshot_version and self.snapshot.is_current():
+            self._load()
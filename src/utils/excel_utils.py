@@ -2,6 +2,7 @@ import pandas as pd
 from typing import Optional, Dict, List
 from datetime import datetime
 import os
+from .snapshot import read_excel_cached, write_excel_cached
 
 class ExcelManager:
     def __init__(self, data_dir: str = 'data'):
@@ -17,7 +18,7 @@ class ExcelManager:
         """Read Excel file safely"""
         try:
             filepath = os.path.join(self.data_dir, filename)
-            return pd.read_excel(filepath)
+            return read_excel_cached(filepath)
         except Exception as e:
             print(f"Error reading {filename}: {e}")
             return pd.DataFrame()
@@ -26,7 +27,7 @@ class ExcelManager:
         """Write DataFrame to Excel safely"""
         try:
             filepath = os.path.join(self.data_dir, filename)
-            df.to_excel(filepath, index=False)
+            write_excel_cached(df, filepath)
             return True
         except Exception as e:
             print(f"Error writing {filename}: {e}")
@@ -36,7 +37,7 @@ class ExcelManager:
         """Append new data to existing Excel file"""
         try:
             filepath = os.path.join(self.data_dir, filename)
-            df = pd.read_excel(filepath) if os.path.exists(filepath) else pd.DataFrame()
+            df = read_excel_cached(filepath) if os.path.exists(filepath) else pd.DataFrame()
             new_df = pd.concat([df, pd.DataFrame([data])], ignore_index=True)
             return self.write_excel(new_df, filename)
         except Exception as e:
@@ -57,7 +58,7 @@ class ExcelManager:
             backup_file = f"{os.path.splitext(filename)[0]}_{timestamp}.xlsx"
             backup_path = os.path.join(backup_dir, backup_file)
             
-            df = pd.read_excel(source)
+            df = read_excel_cached(source)
             df.to_excel(backup_path, index=False)
             return True
         except Exception as e:
@@ -16,4 +16,13 @@ class InvalidDataError(InventoryError):
 
 class ExcelError(InventoryError):
     """Raised when there are issues with Excel operations"""
-    pass
\ No newline at end of file
+    pass
+
+class TaskTimeoutError(InventoryError):
+    """Raised when background work exceeds its time limit"""
+    pass
+
+
+class QuerySyntaxError(InvalidDataError):
+    """Raised when a structured search query cannot be parsed"""
+    pass
@@ -0,0 +1,144 @@
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+import asyncio
+import os
+import threading
+import time
+from .exceptions import TaskTimeoutError
+from .logger import setup_logger
+
+logger = setup_logger()
+
+# Blocking I/O (Excel reads/writes, pandas lookups) runs on threads; CPU-bound
+# analytics runs in worker processes so it does not hold the GIL
+EXECUTOR_IO_WORKERS = int(os.getenv('EXECUTOR_IO_WORKERS', '8'))
+EXECUTOR_CPU_WORKERS = int(os.getenv('EXECUTOR_CPU_WORKERS', str(min(4, os.cpu_count() or 1))))
+EXECUTOR_TIMEOUT = float(os.getenv('EXECUTOR_TIMEOUT', '30'))
+
+_DEFAULT = object()
+
+class WorkerPool:
+    """A lazily started executor plus its queue-depth and outcome counters"""
+
+    def __init__(self, name: str, factory: Callable[[int], Any], workers: int):
+        self.name = name
+        self.workers = workers
+        self._factory = factory
+        self._executor = None
+        self._inflight: Set[Future] = set()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.max_queued = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory(self.workers)
+            future = self._executor.submit(func, *args, **kwargs)
+            self._inflight.add(future)
+            self.submitted += 1
+            self.max_queued = max(self.max_queued, self._queued())
+        submitted_at = time.monotonic()
+        future.add_done_callback(lambda f: self._finished(f, submitted_at))
+        return future
+
+    def _finished(self, future: Future, submitted_at: float):
+        elapsed = time.monotonic() - submitted_at
+        with self._lock:
+            self._inflight.discard(future)
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self._latency_total += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+
+    def _queued(self) -> int:
+        return sum(not future.running() for future in self._inflight)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            finished = self.completed + self.failed
+            queued = self._queued()
+            return {
+                'workers': self.workers,
+                'queued': queued,
+                'running': len(self._inflight) - queued,
+                'max_queued': self.max_queued,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'timed_out': self.timed_out,
+                'cancelled': self.cancelled,
+                'avg_latency_ms': round(self._latency_total / finished * 1000, 1) if finished else 0.0,
+                'max_latency_ms': round(self._latency_max * 1000, 1)
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+class TaskExecutor:
+    """Runs blocking calls off the event loop with a time limit.
+
+    `run_io` uses a thread pool and `run_cpu` a process pool (the function and
+    its arguments must be picklable). When the awaiting coroutine is cancelled
+    or the timeout expires, work that has not started yet is dropped; work
+    already running cannot be interrupted and finishes in the background,
+    showing up as `running` in `stats()`.
+    """
+
+    def __init__(self, io_workers: int = EXECUTOR_IO_WORKERS,
+                 cpu_workers: int = EXECUTOR_CPU_WORKERS, timeout: float = EXECUTOR_TIMEOUT):
+        self.timeout = timeout
+        self.io = WorkerPool(
+            'io', lambda workers: ThreadPoolExecutor(workers, thread_name_prefix='executor-io'), io_workers
+        )
+        self.cpu = WorkerPool('cpu', ProcessPoolExecutor, cpu_workers)
+
+    async def run_io(self, func: Callable, *args, timeout: Optional[float] = _DEFAULT, **kwargs) -> Any:
+        """Await `func(*args, **kwargs)` on the I/O thread pool"""
+        return await self._run(self.io, func, args, kwargs, timeout)
+
+    async def run_cpu(self, func: Callable, *args, timeout: Optional[float] = _DEFAULT, **kwargs) -> Any:
+        """Await `func(*args, **kwargs)` in a worker process"""
+        return await self._run(self.cpu, func, args, kwargs, timeout)
+
+    async def _run(self, pool: WorkerPool, func: Callable, args: tuple, kwargs: Dict,
+                   timeout: Optional[float]) -> Any:
+        if timeout is _DEFAULT:
+            timeout = self.timeout
+        future = pool.submit(func, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            pool.timed_out += 1
+            name = getattr(func, '__qualname__', repr(func))
+            logger.warning(f"{name} exceeded {timeout}s on the {pool.name} pool")
+            raise TaskTimeoutError(f"{name} did not finish within {timeout}s")
+        except asyncio.CancelledError:
+            future.cancel()
+            pool.cancelled += 1
+            raise
+
+    def stats(self) -> Dict:
+        return {'io': self.io.stats(), 'cpu': self.cpu.stats()}
+
+    def shutdown(self, wait: bool = True):
+        """Stop both pools, dropping work that has not started"""
+        self.io.shutdown(wait)
+        self.cpu.shutdown(wait)
+
+# Shared by the bot handlers and services
+executor = TaskExecutor()
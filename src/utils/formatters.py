@@ -13,6 +13,17 @@ def format_product_details(product: dict) -> str:
     
     return '\n'.join(details)
 
+def format_db_product(product) -> str:
+    """Format a database Product row for display"""
+    return format_product_details({
+        'Model': product.model,
+        'RAM': product.ram,
+        'Network': product.network,
+        'Price': product.price or 0,
+        'Status': product.status,
+        'IMEI': product.imei
+    })
+
 def format_help_message(role: str) -> str:
     """Format help message based on user role"""
     base_commands = [
@@ -21,10 +32,13 @@ def format_help_message(role: str) -> str:
         "- Format: `ram:4gb` or just `4gb`",
         "- Format: `network:5g` or just `5g`",
         "- Format: `model:iphone`",
+        "- Combine with `OR`, exclude with `-` or `NOT`, quote phrases",
         "\n📱 *Examples:*",
         "- `4gb` (search by RAM)",
         "- `5g` (search by network)",
         "- `iphone 13` (search by model)",
+        "- `model:iphone ram:8gb price:<800`",
+        "- `\"13 pro\" OR pixel -status:sold`",
     ]
     
     role_commands = {
@@ -33,12 +47,15 @@ def format_help_message(role: str) -> str:
             "/refresh - Reload product data",
             "/update - Update product details",
             "/transfer - Transfer products",
-            "/stats - View statistics"
+            "/transfer_batch - Transfer many products at once",
+            "/stats - View statistics",
+            "/executor - View background task queues"
         ],
         'power_user': [
             "\n🔧 *Power User Commands:*",
             "/refresh - Reload product data",
-            "/transfer - Transfer products"
+            "/transfer - Transfer products",
+            "/transfer_batch - Transfer many products at once"
         ],
         'user': []
     }
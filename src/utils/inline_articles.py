@@ -0,0 +1,78 @@
+from functools import reduce
+from typing import Callable, Dict, List, Tuple
+import os
+import threading
+import numpy as np
+from telegram import InlineQueryResultArticle, InputTextMessageContent
+from .data_manager import DataManager
+from .exceptions import InventoryError
+from .query_cache import normalize_query
+from .query_language import is_plain, parse_query
+
+INLINE_PAGE_SIZE = 50  # Telegram's maximum results per answer
+INLINE_CACHE_TIME = int(os.getenv('INLINE_CACHE_TIME', '30'))
+MIN_TERM_LENGTH = 2
+
+class InlineArticleCache:
+    """Rendered inline query results, one per product row.
+
+    An article is rendered the first time a product is shown and reused until
+    the DataManager's data version changes, so answering a keystroke is a few
+    cached term lookups plus a slice of ready-made objects.
+    """
+
+    def __init__(self, data_manager: DataManager, format_product: Callable[[Dict], str],
+                 page_size: int = INLINE_PAGE_SIZE):
+        self.data_manager = data_manager
+        self.format_product = format_product
+        self.page_size = page_size
+        self._articles: Dict[int, InlineQueryResultArticle] = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _render(self, position: int) -> InlineQueryResultArticle:
+        product = self.data_manager.df.iloc[position].to_dict()
+        details = ' · '.join(
+            str(product[field]) for field in ('RAM', 'Storage', 'Network') if product.get(field)
+        )
+        return InlineQueryResultArticle(
+            id=str(product.get('ID', position)),
+            title=f"{product.get('Brand', '')} {product.get('Model', '')}".strip(),
+            description=f"{details} · ${product.get('Price', 0):,.2f} · Stock {product.get('Stock', 'N/A')}",
+            input_message_content=InputTextMessageContent(
+                self.format_product(product), parse_mode='Markdown'
+            )
+        )
+
+    def article(self, position: int) -> InlineQueryResultArticle:
+        with self._lock:
+            version = self.data_manager.search_cache.version
+            if self._version != version:
+                self._articles.clear()
+                self._version = version
+            article = self._articles.get(position)
+            if article is None:
+                article = self._articles[position] = self._render(position)
+            return article
+
+    def positions(self, query: str) -> np.ndarray:
+        """Rows matching every term of `query`, e.g. 'iphone 13 256'"""
+        terms = [term for term in query.split() if len(term) >= MIN_TERM_LENGTH]
+        if not terms:
+            return np.empty(0, dtype=np.intp)
+        query = normalize_query(query)
+        if not is_plain(parse_query(query), query):
+            # Fields, operators and phrases need the query as a whole
+            return self.data_manager.search_positions(query)
+        # Each term's result is cached, so extending a query only searches the new term
+        return reduce(np.intersect1d, (self.data_manager.search_positions(term) for term in terms))
+
+    def page(self, query: str, offset: int = 0) -> Tuple[List[InlineQueryResultArticle], str]:
+        """Results for `query` starting at `offset`, and the next offset ('' at the end)"""
+        try:
+            positions = self.positions(query)
+        except InventoryError:
+            return [], ''
+        end = offset + self.page_size
+        results = [self.article(int(position)) for position in positions[offset:end]]
+        return results, str(end) if end < len(positions) else ''
@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import threading
+from typing import Dict, Iterator, Optional
+from .logger import setup_logger
+
+logger = setup_logger()
+
+
+class Journal:
+    """Append-only JSONL write-ahead journal.
+
+    Every record is written as one line and fsync'd before `append` returns.
+    `rotate` moves the pending records aside so they can be compacted into
+    the workbooks while new mutations keep appending to a fresh file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.compacting_path = f"{path}.compacting"
+        self._lock = threading.Lock()
+        self._truncate_torn_tail()
+        self._file = open(self.path, 'ab')
+
+    def append(self, record: Dict):
+        """Durably append a single record"""
+        line = json.dumps(record, default=str).encode('utf-8') + b'\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def replay(self) -> Iterator[Dict]:
+        """Yield records not yet compacted, oldest first"""
+        for path in (self.compacting_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                for line_no, line in enumerate(f, 1):
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipping unreadable journal record {path}:{line_no}")
+
+    def rotate(self) -> Optional[str]:
+        """Move pending records to the compacting file and start a new journal"""
+        with self._lock:
+            self._file.close()
+            if os.path.getsize(self.path):
+                if os.path.exists(self.compacting_path):
+                    # A previous compaction failed; keep its records in front
+                    with open(self.path, 'rb') as src, open(self.compacting_path, 'ab') as dst:
+                        shutil.copyfileobj(src, dst)
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                    os.remove(self.path)
+                else:
+                    os.replace(self.path, self.compacting_path)
+            self._file = open(self.path, 'ab')
+
+        return self.compacting_path if os.path.exists(self.compacting_path) else None
+
+    def discard(self, path: str):
+        """Remove a compacted journal file"""
+        if os.path.exists(path):
+            os.remove(path)
+
+    def size(self) -> int:
+        """Bytes waiting to be compacted"""
+        total = 0
+        for path in (self.compacting_path, self.path):
+            if os.path.exists(path):
+                total += os.path.getsize(path)
+        return total
+
+    def _truncate_torn_tail(self):
+        """Drop a partial last line left by a crash so new records start clean"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            end = data.rfind(b'\n') + 1
+            if end != len(data):
+                logger.warning(f"Truncating torn record at the end of {self.path}")
+                f.truncate(end)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import os
+import secrets
+import threading
+import time
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Message, Update
+from telegram.ext import ContextTypes
+
+RESULTS_PAGE_SIZE = int(os.getenv('RESULTS_PAGE_SIZE', '5'))
+RESULTS_CACHE_TTL = float(os.getenv('RESULTS_CACHE_TTL', '900'))
+RESULTS_CACHE_SIZE = int(os.getenv('RESULTS_CACHE_SIZE', '256'))
+
+# Callback data is "page:<token>:<page>", well under Telegram's 64 bytes
+PAGE_CALLBACK_PREFIX = 'page'
+PAGE_CALLBACK_PATTERN = rf'^{PAGE_CALLBACK_PREFIX}:'
+MAX_MESSAGE_LENGTH = 4096
+
+class ResultPager:
+    """Search results rendered one page per message, paged with inline buttons.
+
+    Result sets are kept server-side (LRU with expiry) and pre-rendered, so
+    Prev/Next only edit the message and never re-run the search.
+    """
+
+    def __init__(self, format_item: Callable[[Dict], str], page_size: int = RESULTS_PAGE_SIZE,
+                 ttl: float = RESULTS_CACHE_TTL, max_size: int = RESULTS_CACHE_SIZE):
+        self.format_item = format_item
+        self.page_size = page_size
+        self.ttl = ttl
+        self.max_size = max_size
+        self._results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def store(self, title: str, items: List[Dict]) -> str:
+        """Cache a result set and return its token"""
+        token = secrets.token_urlsafe(6)
+        rendered = [self.format_item(item) for item in items]
+        with self._lock:
+            self._results[token] = (time.monotonic() + self.ttl, title, rendered)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+        return token
+
+    def _get(self, token: str) -> Optional[Tuple[str, List[str]]]:
+        with self._lock:
+            entry = self._results.get(token)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._results[token]
+                return None
+            self._results.move_to_end(token)
+            return entry[1], entry[2]
+
+    def render(self, token: str, page: int) -> Optional[Tuple[str, Optional[InlineKeyboardMarkup]]]:
+        """Text and keyboard for one page, or None if the result set expired"""
+        entry = self._get(token)
+        if entry is None:
+            return None
+        title, rendered = entry
+        pages = max(1, -(-len(rendered) // self.page_size))
+        page = min(max(page, 0), pages - 1)
+        start = page * self.page_size
+
+        text = title
+        if pages > 1:
+            text += f" (page {page + 1}/{pages})"
+        for block in rendered[start:start + self.page_size]:
+            if len(text) + len(block) + 2 > MAX_MESSAGE_LENGTH:
+                break
+            text += "\n\n" + block
+
+        buttons = []
+        if page > 0:
+            buttons.append(InlineKeyboardButton(
+                "◀️ Prev", callback_data=f"{PAGE_CALLBACK_PREFIX}:{token}:{page - 1}"
+            ))
+        if page < pages - 1:
+            buttons.append(InlineKeyboardButton(
+                "Next ▶️", callback_data=f"{PAGE_CALLBACK_PREFIX}:{token}:{page + 1}"
+            ))
+        return text, InlineKeyboardMarkup([buttons]) if buttons else None
+
+    async def reply(self, message: Message, title: str, items: List[Dict], parse_mode: str = 'Markdown'):
+        """Send the first page of `items` as a single message"""
+        token = self.store(title, items)
+        text, keyboard = self.render(token, 0)
+        await message.reply_text(text, parse_mode=parse_mode, reply_markup=keyboard)
+
+    async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                              parse_mode: str = 'Markdown'):
+        """Turn the page for a Prev/Next button press"""
+        query = update.callback_query
+        try:
+            _, token, page = query.data.split(':')
+            page = int(page)
+        except ValueError:
+            await query.answer()
+            return
+
+        rendered = self.render(token, page)
+        if rendered is None:
+            await query.answer("These results have expired. Please search again.", show_alert=True)
+            return
+
+        text, keyboard = rendered
+        await query.answer()
+        await query.edit_message_text(text, parse_mode=parse_mode, reply_markup=keyboard)
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import os
+import threading
+import time
+
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', '512'))
+QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', '300'))
+
+_MISSING = object()
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query.
+
+    Searches run on the normalized form so that it is an exact cache key.
+    """
+    return ' '.join(str(query).lower().split())
+
+class QueryCache:
+    """LRU cache of search results with expiry, tagged with a data version.
+
+    Owners call `bump()` on every mutation or refresh; entries stored under an
+    older version are never returned.
+    """
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self.version or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, value: Any, version: Optional[int] = None):
+        """Store `value`, dropping it if the data changed since `version` was read"""
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._entries[key] = (self.version, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            version = self.version
+            value = compute()
+            self.put(key, value, version)
+        return value
+
+    def bump(self):
+        """Invalidate every cached result after the underlying data changed"""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,294 @@
+from dataclasses import dataclass
+from difflib import get_close_matches
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import operator
+import os
+import re
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, false, func, not_, or_
+from .exceptions import QuerySyntaxError
+
+QUERY_PARSE_CACHE_SIZE = int(os.getenv('QUERY_PARSE_CACHE_SIZE', '1024'))
+
+# Field name (and aliases) users may type -> canonical field
+FIELD_ALIASES = {
+    'model': 'model',
+    'brand': 'brand',
+    'ram': 'ram',
+    'storage': 'storage',
+    'rom': 'storage',
+    'network': 'network',
+    'net': 'network',
+    'color': 'color',
+    'colour': 'color',
+    'condition': 'condition',
+    'status': 'status',
+    'imei': 'imei',
+    'price': 'price',
+    'stock': 'stock',
+    'shop': 'shop',
+    'shop_id': 'shop'
+}
+# Substring match, e.g. model:iphone
+CONTAINS_FIELDS = {'model', 'brand', 'color'}
+# Whole-value match ignoring case, e.g. ram:4gb does not match 24GB
+EXACT_FIELDS = {'ram', 'storage', 'network', 'condition', 'status', 'imei'}
+# Stored in one spelling (lowercase statuses, digit-only IMEIs), so SQL can use plain equality
+CANONICAL_FIELDS = {'status', 'imei'}
+# Numbers, with optional comparison, e.g. price:<500
+NUMERIC_FIELDS = {'price', 'stock', 'shop'}
+
+COMPARISONS = {
+    ':': operator.eq,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge
+}
+KEYWORDS = {'and', 'or', 'not'}
+# Tokens that show the user meant a structured query rather than plain words
+STRUCTURE_TOKENS = {'field', 'open', 'close', 'phrase', 'negate'}
+
+_TOKEN = re.compile(r'''
+    \s*(?:
+        (?P<open>\() | (?P<close>\)) |
+        (?P<negate>-)(?=[^\s)]) |
+        (?P<field>[a-z_]+):(?P<op><=|>=|<|>)? |
+        "(?P<phrase>[^"]*)" |
+        (?P<word>[^\s()"]+)
+    )
+''', re.IGNORECASE | re.VERBOSE)
+_WORD = re.compile(r'\s*(?P<word>[^\s()"]+)')
+
+
+@dataclass(frozen=True)
+class Term:
+    """`value` in `field` (any text field when field is None)"""
+    value: str
+    field: Optional[str] = None
+    op: str = ':'
+
+
+@dataclass(frozen=True)
+class Not:
+    operand: 'Node'
+
+
+@dataclass(frozen=True)
+class And:
+    operands: Tuple['Node', ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    operands: Tuple['Node', ...]
+
+
+Node = Union[Term, Not, And, Or]
+
+
+def _tokenize(query: str) -> List[Tuple[str, str]]:
+    tokens, position = [], 0
+    query = query.rstrip()
+    while position < len(query):
+        match = _TOKEN.match(query, position)
+        if match is None or match.end() == position:
+            raise QuerySyntaxError(f"Unbalanced quote in query: {query}")
+        kind = match.lastgroup
+        if kind == 'op':
+            kind = 'field'
+        if kind == 'field' and match.group('field').lower() not in FIELD_ALIASES:
+            _check_field(match.group('field').lower())
+            # Not a field at all (e.g. 'iphone:13'): the whole thing is a word
+            match, kind = _WORD.match(query, position), 'word'
+        position = match.end()
+        if kind == 'field':
+            tokens.append(('field', match.group('field').lower()))
+            tokens.append(('op', match.group('op') or ':'))
+        elif kind == 'word' and match.group('word').lower() in KEYWORDS:
+            tokens.append(('keyword', match.group('word').lower()))
+        else:
+            tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+def _check_field(name: str):
+    """Reject a prefix that looks like a misspelt field, e.g. 'modle:'"""
+    suggestions = get_close_matches(name, FIELD_ALIASES, n=1, cutoff=0.8)
+    if suggestions:
+        raise QuerySyntaxError(
+            f"Unknown field '{name}', did you mean '{suggestions[0]}'? "
+            f"Fields: {', '.join(sorted(set(FIELD_ALIASES.values())))}"
+        )
+
+
+class _Parser:
+    """Recursive descent over: or := and (OR and)*; and := not ([AND] not)*;
+    not := (NOT | -) not | '(' or ')' | [field:] (word | "phrase")"""
+
+    def __init__(self, query: str):
+        self.query = query
+        self.tokens = _tokenize(query)
+        self.position = 0
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise QuerySyntaxError("Empty search query")
+        node = self._or()
+        if self._peek():
+            raise QuerySyntaxError(f"Unexpected '{self._peek()[1]}' in query: {self.query}")
+        return node
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise QuerySyntaxError(f"Query ends unexpectedly: {self.query}")
+        self.position += 1
+        return token
+
+    def _or(self) -> Node:
+        operands = [self._and()]
+        while self._peek() == ('keyword', 'or'):
+            self._take()
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else Or(tuple(operands))
+
+    def _and(self) -> Node:
+        operands = [self._not()]
+        while self._peek() and self._peek() not in (('keyword', 'or'), ('close', ')')):
+            if self._peek() == ('keyword', 'and'):
+                self._take()
+            operands.append(self._not())
+        return operands[0] if len(operands) == 1 else And(tuple(operands))
+
+    def _not(self) -> Node:
+        kind, value = self._take()
+        if kind == 'negate' or (kind, value) == ('keyword', 'not'):
+            return Not(self._not())
+        if kind == 'open':
+            node = self._or()
+            if self._take() != ('close', ')'):
+                raise QuerySyntaxError(f"Missing ')' in query: {self.query}")
+            return node
+        if kind == 'field':
+            return self._field_term(value)
+        if kind in ('word', 'phrase'):
+            return Term(value.lower())
+        raise QuerySyntaxError(f"Unexpected '{value}' in query: {self.query}")
+
+    def _field_term(self, name: str) -> Term:
+        field = FIELD_ALIASES[name]
+        _, op = self._take()
+        kind, value = self._take()
+        if kind not in ('word', 'phrase'):
+            raise QuerySyntaxError(f"Missing value for '{name}:' in query: {self.query}")
+        if field in NUMERIC_FIELDS:
+            try:
+                float(value)
+            except ValueError:
+                raise QuerySyntaxError(f"'{name}' needs a number, got '{value}'")
+        elif op != ':':
+            raise QuerySyntaxError(f"'{name}' cannot be compared with '{op}'")
+        return Term(value.lower(), field, op)
+
+
+@lru_cache(maxsize=QUERY_PARSE_CACHE_SIZE)
+def parse_query(query: str) -> Node:
+    """Parse a search query into an immutable tree (cached per query string).
+
+    A query without fields, quotes, parentheses or '-' that does not parse
+    (e.g. 'samsung or') is taken as plain words.
+    """
+    parser = _Parser(query)
+    try:
+        return parser.parse()
+    except QuerySyntaxError:
+        if any(kind in STRUCTURE_TOKENS for kind, _ in parser.tokens):
+            raise
+    terms = tuple(Term(value.lower()) for _, value in parser.tokens)
+    return terms[0] if len(terms) == 1 else And(terms)
+
+
+def is_plain(node: Node, query: str) -> bool:
+    """Whether `query` is just words, which the plain text search already handles"""
+    terms = node.operands if isinstance(node, And) else (node,)
+    if not all(isinstance(term, Term) and term.field is None for term in terms):
+        return False
+    # Rules out keywords and quotes, which leave no Term of their own
+    return ' '.join(term.value for term in terms) == ' '.join(query.lower().split())
+
+
+def compile_mask(node: Node, df: pd.DataFrame, columns: Dict[str, str],
+                 text_match: Callable[[str], np.ndarray]) -> np.ndarray:
+    """Boolean row mask of `df` for a parsed query.
+
+    `columns` maps canonical fields to the frame's columns and `text_match`
+    returns the mask for a bare word or phrase (usually via a search index).
+    Each column is lower-cased at most once per call.
+    """
+    lowered: Dict[str, pd.Series] = {}
+
+    def text(column: str) -> pd.Series:
+        if column not in lowered:
+            # Empty cells stay NaN (not the text 'nan') and match nothing
+            lowered[column] = df[column].astype(str).str.lower().where(df[column].notna())
+        return lowered[column]
+
+    def visit(node: Node) -> np.ndarray:
+        if isinstance(node, And):
+            return np.logical_and.reduce([visit(operand) for operand in node.operands])
+        if isinstance(node, Or):
+            return np.logical_or.reduce([visit(operand) for operand in node.operands])
+        if isinstance(node, Not):
+            return ~visit(node.operand)
+        if node.field is None:
+            return np.asarray(text_match(node.value), dtype=bool)
+        column = columns.get(node.field)
+        if column is None or column not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        if node.field in NUMERIC_FIELDS:
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            return COMPARISONS[node.op](values, float(node.value))
+        if node.field in EXACT_FIELDS:
+            return (text(column) == node.value).fillna(False).to_numpy(dtype=bool)
+        return text(column).str.contains(node.value, regex=False).fillna(False).to_numpy(dtype=bool)
+
+    return visit(node)
+
+
+def compile_sql(node: Node, columns: Dict[str, object], text_match: Callable[[str], object]):
+    """SQLAlchemy WHERE clause for a parsed query, matching `compile_mask`.
+
+    `columns` maps canonical fields to mapped columns and `text_match` builds
+    the clause for a bare word or phrase. Exact matches compare lower(column)
+    (see the functional indexes on Product) and a negated term keeps rows
+    where the column is NULL, as the pandas mask does for NaN.
+    """
+    if isinstance(node, And):
+        return and_(*(compile_sql(operand, columns, text_match) for operand in node.operands))
+    if isinstance(node, Or):
+        return or_(*(compile_sql(operand, columns, text_match) for operand in node.operands))
+    if isinstance(node, Not):
+        operand = node.operand
+        column = columns.get(operand.field) if isinstance(operand, Term) else None
+        if column is not None:
+            return or_(column.is_(None), not_(compile_sql(operand, columns, text_match)))
+        # NULL anywhere below counts as no match, so NOT (NULL) must be true
+        return not_(func.coalesce(compile_sql(operand, columns, text_match), false()))
+    if node.field is None:
+        return text_match(node.value)
+    column = columns.get(node.field)
+    if column is None:
+        return false()
+    if node.field in NUMERIC_FIELDS:
+        return COMPARISONS[node.op](column, float(node.value))
+    if node.field in CANONICAL_FIELDS:
+        return column == node.value
+    if node.field in EXACT_FIELDS:
+        return func.lower(column) == node.value
+    return column.icontains(node.value, autoescape=True)
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Sequence
+import numpy as np
+import pandas as pd
+
+
+class InvertedIndex:
+    """Token -> row position posting lists over a fixed set of text fields.
+
+    Queries keep the substring semantics of a plain `str.contains` over the
+    indexed fields: every whitespace-separated piece of the query must occur
+    inside some token of the row, which narrows the candidates before the
+    full query is verified against the stored lowercase values.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = list(fields)
+        self._values: Dict[str, np.ndarray] = {}
+        self._postings: Dict[str, np.ndarray] = {}
+        self._size = 0
+
+    def build(self, df: pd.DataFrame):
+        """(Re)build the index from a DataFrame"""
+        postings = defaultdict(list)
+        self._values = {}
+
+        for field in self.fields:
+            if field not in df.columns:
+                continue
+            column = df[field]
+            # Empty cells are not tokenised (as 'nan') and never match
+            present = np.flatnonzero(column.notna().to_numpy())
+            values = np.full(len(df), '', dtype=object)
+            values[present] = column.iloc[present].astype(str).str.lower().to_numpy(dtype=object)
+            self._values[field] = values
+
+            codes, uniques = pd.factorize(values[present])
+            order = present[np.argsort(codes, kind='stable')]
+            bounds = np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1]
+            for value, rows in zip(uniques, np.split(order, bounds)):
+                for token in set(value.split()):
+                    postings[token].append(rows)
+
+        self._postings = {
+            token: np.unique(np.concatenate(rows)) for token, rows in postings.items()
+        }
+        self._size = len(df)
+
+    def search(self, query: str) -> np.ndarray:
+        """Return sorted row positions whose fields contain the query"""
+        query = query.lower()
+        candidates = None
+
+        for piece in query.split():
+            matches = [rows for token, rows in self._postings.items() if piece in token]
+            if not matches:
+                return np.empty(0, dtype=np.intp)
+            rows = np.unique(np.concatenate(matches))
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+            if not len(candidates):
+                return candidates
+
+        if candidates is None:
+            candidates = np.arange(self._size)
+
+        return np.array([
+            row for row in candidates
+            if any(query in values[row] for values in self._values.values())
+        ], dtype=np.intp)
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class TrigramIndex:
+    """Trigram index over the distinct values of a set of text fields.
+
+    Query trigrams narrow the candidate values, a substring check verifies
+    them, and each surviving value maps back to the rows that hold it.
+    Rows can be appended without rebuilding the whole index.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = list(fields)
+        self._value_ids: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._value_rows: List[List[int]] = []
+        self._trigrams: Dict[str, set] = defaultdict(set)
+
+    def build(self, df: pd.DataFrame):
+        """(Re)build the index from a DataFrame"""
+        self._value_ids = {}
+        self._values = []
+        self._value_rows = []
+        self._trigrams = defaultdict(set)
+
+        for field in self.fields:
+            if field not in df.columns:
+                continue
+            column = df[field]
+            present = np.flatnonzero(column.notna().to_numpy())
+            codes, uniques = pd.factorize(column.iloc[present].astype(str).str.lower())
+            order = present[np.argsort(codes, kind='stable')]
+            bounds = np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1]
+            for value, rows in zip(uniques, np.split(order, bounds)):
+                self._value_rows[self._value_id(value)].extend(rows.tolist())
+
+    def add(self, position: int, row: Mapping):
+        """Index a row appended at the given position"""
+        for field in self.fields:
+            if field in row and not pd.isna(row[field]):
+                value = str(row[field]).lower()
+                self._value_rows[self._value_id(value)].append(position)
+
+    def search(self, query: str) -> np.ndarray:
+        """Return sorted row positions with a field containing the query"""
+        query = query.lower()
+        grams = self._grams(query)
+
+        if grams:
+            candidates = sorted((self._trigrams.get(gram, set()) for gram in grams), key=len)
+            value_ids = set.intersection(*candidates)
+        else:
+            value_ids = range(len(self._values))
+
+        matches = [self._value_rows[i] for i in value_ids if query in self._values[i]]
+        if not matches:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(matches)).astype(np.intp)
+
+    def _value_id(self, value: str) -> int:
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            value_id = len(self._values)
+            self._value_ids[value] = value_id
+            self._values.append(value)
+            self._value_rows.append([])
+            for gram in self._grams(value):
+                self._trigrams[gram].add(value_id)
+        return value_id
+
+    @staticmethod
+    def _grams(text: str) -> set:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def index_key(value) -> str:
+    """Normalize an IMEI/ID cell so 123, 123.0 and '123' share one key"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def position_index(values: Iterable) -> Dict[str, int]:
+    """Map each key to the row position of its first occurrence"""
+    index = {}
+    for position, value in enumerate(values):
+        index.setdefault(index_key(value), position)
+    return index
@@ -0,0 +1,168 @@
+from collections import deque
+from typing import Any, Deque, Dict
+import asyncio
+import os
+import time
+from telegram.error import RetryAfter
+from .logger import setup_logger
+
+logger = setup_logger()
+
+# Telegram allows about 30 messages/s overall and 1 message/s per chat
+SEND_GLOBAL_RATE = float(os.getenv('SEND_GLOBAL_RATE', '30'))
+SEND_CHAT_RATE = float(os.getenv('SEND_CHAT_RATE', '1'))
+SEND_MAX_RETRIES = int(os.getenv('SEND_MAX_RETRIES', '5'))
+MAX_MESSAGE_LENGTH = 4096
+MAX_IDLE_BUCKETS = 1024
+COALESCE_SEPARATOR = '\n\n'
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursting up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def refilled(self) -> bool:
+        """Whether the bucket is full again, i.e. a fresh one would behave the same"""
+        return (time.monotonic() - self._updated) * self.rate >= self.capacity - self._tokens
+
+class _Outgoing:
+    __slots__ = ('text', 'options', 'future')
+
+    def __init__(self, text: str, options: Dict[str, Any], future: asyncio.Future):
+        self.text = text
+        self.options = options
+        self.future = future
+
+class SendQueue:
+    """Central outbound queue for Telegram messages.
+
+    Each chat drains its own FIFO, paced by a per-chat token bucket and a
+    shared global one. Consecutive queued messages to a chat with the same
+    options are joined into one message of at most 4096 characters, and
+    RetryAfter is waited out and retried. `bot` is anything with an async
+    `send_message(chat_id=..., text=..., **options)`, such as telegram.Bot.
+    """
+
+    def __init__(self, bot, global_rate: float = SEND_GLOBAL_RATE,
+                 chat_rate: float = SEND_CHAT_RATE, max_retries: int = SEND_MAX_RETRIES):
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate)
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+        self._pending: Dict[Any, Deque[_Outgoing]] = {}
+        self._workers: Dict[Any, asyncio.Task] = {}
+        self.sent = 0
+        self.coalesced = 0
+        self.retries = 0
+
+    def enqueue(self, chat_id, text: str, **options) -> asyncio.Future:
+        """Queue a message; the future resolves to the sent Message"""
+        future = asyncio.get_running_loop().create_future()
+        # _deliver logs failures; retrieving the exception stops asyncio warning
+        # again about it for callers that never await the future
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._pending.setdefault(chat_id, deque()).append(_Outgoing(text, options, future))
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._drain(chat_id))
+        return future
+
+    async def send(self, chat_id, text: str, **options):
+        """Queue a message and wait until it has been delivered"""
+        return await self.enqueue(chat_id, text, **options)
+
+    async def join(self):
+        """Wait until every queued message has been sent or has failed"""
+        while self._workers:
+            await asyncio.gather(*list(self._workers.values()), return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'retries': self.retries,
+            'queued': sum(len(queue) for queue in self._pending.values()),
+            'active_chats': len(self._workers)
+        }
+
+    async def _drain(self, chat_id):
+        bucket = self._chat_buckets.setdefault(chat_id, TokenBucket(self.chat_rate))
+        queue = self._pending[chat_id]
+        try:
+            while queue:
+                await bucket.acquire()
+                batch = [queue.popleft()]
+                length = len(batch[0].text)
+                while queue and self._joinable(batch[0], queue[0], length):
+                    length += len(COALESCE_SEPARATOR) + len(queue[0].text)
+                    batch.append(queue.popleft())
+                await self._deliver(chat_id, batch)
+        finally:
+            del self._workers[chat_id]
+            if not queue:
+                self._pending.pop(chat_id, None)
+            if len(self._chat_buckets) > MAX_IDLE_BUCKETS:
+                # Only forget chats whose bucket has refilled, so none can burst past its rate
+                self._chat_buckets = {
+                    chat: bucket for chat, bucket in self._chat_buckets.items()
+                    if chat in self._workers or not bucket.refilled()
+                }
+
+    @staticmethod
+    def _joinable(first: _Outgoing, item: _Outgoing, length: int) -> bool:
+        """Whether `item` can be appended to a batch of `length` characters led by `first`"""
+        return (
+            item.options == first.options
+            and 'reply_markup' not in item.options
+            and length + len(COALESCE_SEPARATOR) + len(item.text) <= MAX_MESSAGE_LENGTH
+        )
+
+    async def _deliver(self, chat_id, batch):
+        text = COALESCE_SEPARATOR.join(item.text for item in batch)
+        options = batch[0].options
+        for attempt in range(self.max_retries + 1):
+            await self._global.acquire()
+            try:
+                message = await self.bot.send_message(chat_id=chat_id, text=text, **options)
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Giving up on chat {chat_id} after {attempt} flood-limit retries")
+                    self._fail(batch, e)
+                    return
+                delay = getattr(e.retry_after, 'total_seconds', lambda: e.retry_after)()
+                self.retries += 1
+                logger.warning(f"Flood limit for chat {chat_id}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logger.error(f"Failed to send message to chat {chat_id}: {str(e)}")
+                self._fail(batch, e)
+                return
+            else:
+                self.sent += 1
+                self.coalesced += len(batch) - 1
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_result(message)
+                return
+
+    @staticmethod
+    def _fail(batch, error: Exception):
+        for item in batch:
+            if not item.future.done():
+                item.future.set_exception(error)
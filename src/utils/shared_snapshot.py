@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+import pandas as pd
+import pyarrow as pa
+from .logger import setup_logger
+from .snapshot import read_excel_cached
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishers are not serialised across processes
+    fcntl = None
+
+logger = setup_logger()
+
+SHARED_SNAPSHOT_DIR = '.shared'
+SHARED_SNAPSHOT_KEEP = int(os.getenv('SHARED_SNAPSHOT_KEEP', '3'))
+
+# Arrow strings map to pandas' Arrow-backed string dtype, so they stay in the mapping too
+_STRING_TYPES = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}
+
+
+class SharedSnapshot:
+    """Immutable, versioned Arrow copy of a workbook shared by every process.
+
+    A publisher writes `<name>.v<N>.arrow` (uncompressed Arrow IPC) and then
+    atomically replaces the `<name>.json` pointer. Readers memory-map the
+    version the pointer names, so all processes share one copy in the page
+    cache, and pick up a new version on their next call after it is published.
+    Frames returned by `frame()` are read-only views; copy before modifying.
+    """
+
+    def __init__(self, excel_path: str):
+        self.excel_path = excel_path
+        directory, filename = os.path.split(excel_path)
+        self.name = os.path.splitext(filename)[0]
+        self.directory = os.path.join(directory, SHARED_SNAPSHOT_DIR)
+        self.pointer_path = os.path.join(self.directory, f"{self.name}.json")
+        self._lock = threading.Lock()
+        self._pointer_stat = None
+        self._meta: Optional[Dict] = None
+        self._table: Optional[pa.Table] = None
+        self._frame: Optional[pd.DataFrame] = None
+
+    @property
+    def version(self) -> int:
+        """Currently published version, 0 when nothing has been published"""
+        meta = self._current()
+        return meta['version'] if meta else 0
+
+    def is_current(self) -> bool:
+        """Whether the published version was built from the workbook as it is on disk"""
+        meta = self._current()
+        if not meta:
+            return False
+        stat = os.stat(self.excel_path)
+        return meta['source'] == {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def table(self) -> Optional[pa.Table]:
+        """The published version as a memory-mapped Arrow table"""
+        with self._lock:
+            meta = self._current()
+            if meta is None:
+                return None
+            if self._table is None or self._table.schema.metadata[b'version'] != str(meta['version']).encode():
+                source = pa.memory_map(os.path.join(self.directory, meta['file']), 'r')
+                self._table = pa.ipc.open_file(source).read_all()
+                self._frame = None
+            return self._table
+
+    def frame(self) -> Optional[pd.DataFrame]:
+        """The published version as a DataFrame over the mapped buffers"""
+        table = self.table()
+        if table is None:
+            return None
+        with self._lock:
+            if self._frame is None or self._table is not table:
+                self._frame = table.to_pandas(split_blocks=True, types_mapper=_STRING_TYPES.get)
+            return self._frame
+
+    def publish(self, df: pd.DataFrame) -> int:
+        """Publish `df` (which must match the workbook on disk) as the next version"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{self.name}.lock"), 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            previous = self._read_pointer()
+            version = (previous['version'] if previous else 0) + 1
+            filename = f"{self.name}.v{version}.arrow"
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}), b'version': str(version).encode()
+            })
+            tmp_path = os.path.join(self.directory, f".{filename}.{os.getpid()}")
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, os.path.join(self.directory, filename))
+
+            stat = os.stat(self.excel_path)
+            self._write_pointer({
+                'version': version,
+                'file': filename,
+                'rows': table.num_rows,
+                'source': {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size},
+                'published_at': time.time()
+            })
+            self._prune(version)
+        logger.info(f"Published {self.name} snapshot v{version} ({table.num_rows} rows)")
+        return version
+
+    def _current(self) -> Optional[Dict]:
+        """Pointer contents, re-read only when the pointer file was replaced"""
+        try:
+            stat = os.stat(self.pointer_path)
+        except FileNotFoundError:
+            return None
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key != self._pointer_stat:
+            self._meta = self._read_pointer()
+            self._pointer_stat = key
+        return self._meta
+
+    def _read_pointer(self) -> Optional[Dict]:
+        try:
+            with open(self.pointer_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_pointer(self, meta: Dict):
+        tmp_path = f"{self.pointer_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.pointer_path)
+
+    def _prune(self, version: int):
+        """Remove old versions; processes still mapping one keep their view until they swap"""
+        for stale in range(max(1, version - 50), version - SHARED_SNAPSHOT_KEEP + 1):
+            try:
+                os.remove(os.path.join(self.directory, f"{self.name}.v{stale}.arrow"))
+            except OSError:
+                pass
+
+
+_snapshots: Dict[str, SharedSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def shared_snapshot(excel_path: str) -> SharedSnapshot:
+    """The process-wide SharedSnapshot for a workbook, so its mapping is reused"""
+    key = os.path.abspath(excel_path)
+    with _snapshots_lock:
+        if key not in _snapshots:
+            _snapshots[key] = SharedSnapshot(excel_path)
+        return _snapshots[key]
+
+
+def load_products(excel_path: str) -> pd.DataFrame:
+    """A workbook's rows from the shared snapshot, publishing one first if it is stale"""
+    snapshot = shared_snapshot(excel_path)
+    if snapshot.is_current():
+        return snapshot.frame()
+    df = read_excel_cached(excel_path)
+    if publish_products(excel_path, df) is None:
+        return df
+    return snapshot.frame()
+
+
+def publish_products(excel_path: str, df: pd.DataFrame) -> Optional[int]:
+    """Publish a frame just written to `excel_path`; returns the version or None.
+
+    On failure readers see that the last version no longer matches the
+    workbook and read the workbook instead.
+    """
+    try:
+        return shared_snapshot(excel_path).publish(df)
+    except Exception as e:
+        # Mixed-type columns Arrow cannot represent, a full disk...
+        logger.warning(f"Could not publish shared snapshot for {excel_path}: {str(e)}")
+        return None
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+import pandas as pd
+from .logger import setup_logger
+
+logger = setup_logger()
+
+SNAPSHOT_DIR = '.snapshots'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ExcelSnapshot:
+    """Columnar Parquet sidecar kept next to an Excel workbook.
+
+    The sidecar is keyed by the workbook's mtime/size and its content hash,
+    so the workbook is only parsed again when it really changed.
+    """
+
+    def __init__(self, excel_path: str):
+        self.excel_path = excel_path
+        directory, filename = os.path.split(excel_path)
+        self.snapshot_dir = os.path.join(directory, SNAPSHOT_DIR)
+        self.data_path = os.path.join(self.snapshot_dir, f"{filename}.parquet")
+        self.meta_path = os.path.join(self.snapshot_dir, f"{filename}.json")
+
+    def load(self) -> pd.DataFrame:
+        """Load the workbook, preferring the sidecar when it is current"""
+        stat = os.stat(self.excel_path)
+        meta = self._read_meta()
+
+        if meta and os.path.exists(self.data_path):
+            if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+                return self._read_sidecar()
+
+            # Touched but maybe not modified (copied, restored from backup...)
+            digest = self._hash_workbook()
+            if meta['sha256'] == digest:
+                self._write_meta(stat, digest)
+                return self._read_sidecar()
+
+        df = pd.read_excel(self.excel_path)
+        self.store(df)
+        return df
+
+    def store(self, df: pd.DataFrame):
+        """Refresh the sidecar from a frame that matches the workbook on disk"""
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            tmp_path = f"{self.data_path}.tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, self.data_path)
+            self._write_meta(os.stat(self.excel_path), self._hash_workbook())
+        except Exception as e:
+            # Mixed-type columns or a missing Parquet engine: keep using Excel
+            logger.warning(f"Could not write snapshot for {self.excel_path}: {str(e)}")
+            self.invalidate()
+
+    def invalidate(self):
+        """Drop the sidecar so the next load parses the workbook"""
+        for path in (self.meta_path, self.data_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _read_sidecar(self) -> pd.DataFrame:
+        return pd.read_parquet(self.data_path)
+
+    def _read_meta(self) -> Optional[Dict]:
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, stat: os.stat_result, digest: str):
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': digest
+            }, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _hash_workbook(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.excel_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+def read_excel_cached(excel_path: str) -> pd.DataFrame:
+    """Drop-in replacement for pd.read_excel backed by a snapshot sidecar"""
+    return ExcelSnapshot(excel_path).load()
+
+
+def write_excel_cached(df: pd.DataFrame, excel_path: str):
+    """Atomically write a workbook and refresh its sidecar without parsing it back"""
+    directory, filename = os.path.split(excel_path)
+    tmp_path = os.path.join(directory, f".~{filename}")
+    df.to_excel(tmp_path, index=False)
+    os.replace(tmp_path, excel_path)
+    ExcelSnapshot(excel_path).store(df)
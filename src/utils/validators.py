@@ -8,7 +8,8 @@ class DataValidator:
         """Validate and sanitize search query"""
         if not query or len(query.strip()) < 2:
             raise InvalidDataError("Query must be at least 2 characters long")
-        return re.sub(r'[<>"/\\&;]', '', query.strip())
+        # Quotes and < > are kept: structured queries use them for phrases and comparisons
+        return re.sub(r'[/\\&;]', '', query.strip())
     
     @staticmethod
     def validate_product_id(product_id: Any) -> int:
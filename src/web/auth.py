@@ -6,7 +6,8 @@ from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from database.models import User, Role
+from src.database.models import User, Role
+from src.services.auth_service import Principal, load_principal, verify_password_async
 import os
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -27,7 +28,7 @@ async def authenticate_user(session: AsyncSession, username: str, password: str)
     result = await session.execute(stmt)
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(password, user.password_hash):
+    if not user or not await verify_password_async(password, user.password_hash):
         return None
     return user
 
@@ -38,7 +39,7 @@ def create_access_token(data: dict) -> str:
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 async def get_current_user(token: str = Depends(oauth2_scheme),
-                          session: AsyncSession = Depends()) -> User:
+                          session: AsyncSession = Depends()) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid credentials",
@@ -53,19 +54,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme),
     except JWTError:
         raise credentials_exception
     
-    stmt = select(User).where(User.username == username)
-    result = await session.execute(stmt)
-    user = result.scalar_one_or_none()
-    
-    if user is None:
+    principal = await load_principal(session, username)
+    if principal is None:
         raise credentials_exception
-    return user
+    return principal
 
-def check_permission(user: User, required_permission: str) -> bool:
-    if not user.roles:
-        return False
-    
-    for role in user.roles:
-        if role.permissions == 'all' or required_permission in role.permissions.split(','):
-            return True
-    return False
\ No newline at end of file
+def check_permission(principal: Principal, required_permission: str) -> bool:
+    return principal.has_permission(required_permission)
\ No newline at end of file
@@ -1,10 +1,18 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from typing import Optional
+import json
+from fastapi import FastAPI, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from src.services.auth_service import AuthService
-from src.services.product_service import ProductService
+from src.services.auth_service import AuthService, Principal
+from src.services.product_service import (
+    ProductService, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, listing_columns, search_cache
+)
 from src.database.database import Database
+from src.utils.executor import executor
+from sqlalchemy.ext.asyncio import AsyncSession
 import uvicorn
 
 app = FastAPI()
@@ -19,8 +27,10 @@ async def startup():
     await db.init_db()
 
 @app.post("/token")
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    session = await db.get_session()
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    session: AsyncSession = Depends(db.get_session)
+):
     auth_service = AuthService(session)
     user = await auth_service.authenticate_user(form_data.username, form_data.password)
     
@@ -33,22 +43,82 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     access_token = auth_service.create_access_token(data={"sub": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
-@app.get("/")
-async def home(token: str = Depends(oauth2_scheme)):
-    session = await db.get_session()
-    auth_service = AuthService(session)
-    user = await auth_service.get_current_user(token)
+async def current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    # Lazy session: a cached principal is resolved without touching the pool
+    async with db.session(checkout=False) as session:
+        user = await AuthService(session).get_principal(token)
     
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
         )
-    
+    return user
+
+async def metrics_user(user: Principal = Depends(current_user)) -> Principal:
+    """Metrics are for admins, as with the bot's /executor command"""
+    if not user.has_permission('view_metrics'):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not permitted to view metrics"
+        )
+    return user
+
+def parse_fields(fields: Optional[str]) -> Optional[list]:
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(',') if f.strip()]
+
+@app.get("/")
+async def home(
+    user: Principal = Depends(current_user),
+    session: AsyncSession = Depends(db.get_session),
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None
+):
+    """One page of products; pass `next_after_id` back as `after_id` for the next"""
     product_service = ProductService(session)
-    products = await product_service.get_all_products()
+    try:
+        products, next_after_id = await product_service.list_products(
+            after_id, limit, parse_fields(fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return {"user": user.username, "products": products, "next_after_id": next_after_id}
+
+@app.get("/products/export")
+async def export_products(user: Principal = Depends(current_user), fields: Optional[str] = None):
+    """Stream the whole catalog as NDJSON, one product per line"""
+    fields = parse_fields(fields)
+    try:
+        listing_columns(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    return {"user": user.username, "products": products}
+    async def lines():
+        # The stream outlives the request's dependencies, so it opens its own session
+        async with db.session() as session:
+            async for product in ProductService(session).iter_products(fields):
+                yield json.dumps(jsonable_encoder(product)) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.get("/metrics/db")
+async def db_metrics(user: Principal = Depends(metrics_user)):
+    """Connection pool usage and checkout wait times"""
+    return db.pool_status()
+
+@app.get("/metrics/search")
+async def search_metrics(user: Principal = Depends(metrics_user)):
+    """Product search cache hit/miss counters"""
+    return search_cache.stats()
+
+@app.get("/metrics/executor")
+async def executor_metrics(user: Principal = Depends(metrics_user)):
+    """Worker pool queue depths and task outcomes"""
+    return executor.stats()
 
 def run_web():
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""Incrementally updated aggregates agree with a rebuild from scratch."""
+import math
+import numpy as np
+import pandas as pd
+from src.services.analytics_service import InventoryAggregates, compute_shop_statistics
+
+METRICS = ['total_products', 'in_stock', 'models', 'stock_value', 'price_sum', 'price_count']
+
+
+def products() -> pd.DataFrame:
+    return pd.DataFrame({
+        'IMEI': [str(i) for i in range(12)],
+        'Shop_ID': [1 + i % 3 for i in range(12)],
+        'Status': [('in_stock', 'sold', 'in_stock', 'returned')[i % 4] for i in range(12)],
+        'Model': [f"Model {i % 5}" for i in range(12)],
+        'Price': [np.nan if i % 7 == 0 else 100.0 + 10 * i for i in range(12)],
+    })
+
+
+def shop_statistics(aggregates: InventoryAggregates) -> dict:
+    return {
+        shop_id: {
+            'total_products': total,
+            'in_stock': aggregates.shop_in_stock[shop_id],
+            'models': len(aggregates.shop_models[shop_id]),
+            'stock_value': aggregates.shop_stock_value[shop_id],
+            'price_sum': aggregates.shop_price_sum[shop_id],
+            'price_count': aggregates.shop_price_count[shop_id],
+        }
+        for shop_id, total in aggregates.shop_totals.items()
+    }
+
+
+def assert_matches_rebuild(aggregates: InventoryAggregates, df: pd.DataFrame):
+    expected = compute_shop_statistics(df, METRICS).to_dict('index')
+    actual = shop_statistics(aggregates)
+    assert actual.keys() == expected.keys()
+    for shop_id, metrics in expected.items():
+        for metric, value in metrics.items():
+            assert math.isclose(actual[shop_id][metric], value, abs_tol=1e-9), (shop_id, metric)
+    assert aggregates.status_counts == df['Status'].value_counts().to_dict()
+    assert aggregates.model_counts == df['Model'].value_counts().to_dict()
+    assert aggregates.prices == sorted(df['Price'].dropna())
+
+
+def test_transfers_match_rebuild():
+    df = products()
+    aggregates = InventoryAggregates()
+    aggregates.build(df)
+
+    for imei, to_shop in [('0', 2), ('4', 4), ('7', 1), ('4', 1)]:
+        assert aggregates.update(imei, shop_id=to_shop)
+        df.loc[df['IMEI'] == imei, 'Shop_ID'] = to_shop
+
+    assert_matches_rebuild(aggregates, df)
+
+
+def test_unknown_imei_is_not_applied():
+    aggregates = InventoryAggregates()
+    aggregates.build(products())
+    assert not aggregates.update('999', shop_id=2)
+    assert_matches_rebuild(aggregates, products())
@@ -0,0 +1,58 @@
+"""PerChatUpdateProcessor keeps per-chat order and caps concurrency across chats.
+
+Both tests go through PTB's process_update, so they also catch a PTB release
+that stops gating it on the `_semaphore` the processor replaces.
+"""
+import asyncio
+from unittest.mock import MagicMock
+from telegram import Update
+from src.utils.bot_runtime import PerChatUpdateProcessor
+
+
+def chat_update(chat_id: int) -> Update:
+    update = MagicMock(spec=Update)
+    update.effective_chat = MagicMock(id=chat_id)
+    return update
+
+
+async def run(processor: PerChatUpdateProcessor, updates, delay):
+    """Process (chat_id, n) updates; return completion order and peak concurrency"""
+    done, running, peak = [], 0, 0
+
+    async def handle(chat_id, n):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(delay(chat_id, n))
+        running -= 1
+        done.append((chat_id, n))
+
+    await asyncio.gather(*(
+        processor.process_update(chat_update(chat_id), handle(chat_id, n))
+        for chat_id, n in updates
+    ))
+    return done, peak
+
+
+def test_updates_of_one_chat_keep_their_order():
+    updates = [(1, n) for n in range(5)] + [(2, n) for n in range(5)]
+    # Later updates finish faster, so any overlap within a chat would reorder them
+    done, _ = asyncio.run(run(PerChatUpdateProcessor(8), updates, lambda chat, n: 0.01 * (5 - n)))
+
+    for chat_id in (1, 2):
+        assert [n for chat, n in done if chat == chat_id] == list(range(5))
+
+
+def test_concurrency_is_capped_across_chats():
+    updates = [(chat_id, 0) for chat_id in range(6)]
+    done, peak = asyncio.run(run(PerChatUpdateProcessor(2), updates, lambda chat, n: 0.02))
+
+    assert len(done) == 6
+    assert peak == 2
+
+
+def test_busy_chat_does_not_hold_the_slots():
+    updates = [(1, n) for n in range(4)] + [(2, 0)]
+    done, _ = asyncio.run(run(PerChatUpdateProcessor(2), updates, lambda chat, n: 0.05 if chat == 1 else 0.01))
+
+    assert done.index((2, 0)) == 0
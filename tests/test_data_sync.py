@@ -0,0 +1,40 @@
+"""The bulk Excel sync runs on the session the bot's startup hands it."""
+import asyncio
+import os
+import pandas as pd
+from sqlalchemy import select
+from src.database.database import Database
+from src.database.models import Product
+from src.services.data_sync import DataSyncService
+
+
+async def sync_twice(url: str, path: str):
+    db = Database(url)
+    await db.init_db()
+    reports = []
+    try:
+        for _ in range(2):
+            async with db.session() as session:
+                reports.append(await DataSyncService(session).sync_from_excel(path))
+        async with db.session() as session:
+            imeis = (await session.execute(select(Product.imei).order_by(Product.imei))).scalars().all()
+    finally:
+        await db.engine.dispose()
+    return reports, imeis
+
+
+def test_sync_inside_checked_out_session(tmp_path):
+    path = os.path.join(tmp_path, 'products.xlsx')
+    pd.DataFrame({
+        'IMEI': [111, 222],
+        'Model': ['iPhone 13', 'Galaxy S21'],
+        'Price': [700, 650],
+        'Status': ['in_stock', None],
+    }).to_excel(path, index=False)
+
+    (first, second), imeis = asyncio.run(
+        sync_twice(f"sqlite+aiosqlite:///{os.path.join(tmp_path, 'sync.db')}", path)
+    )
+    assert first['inserted'] == 2
+    assert imeis == ['111', '222']
+    assert second['inserted'] == 0 and second['unchanged'] == 2
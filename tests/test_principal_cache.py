@@ -0,0 +1,60 @@
+"""Cached principals pick up committed user and role changes through the web auth dependency."""
+import asyncio
+import os
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import selectinload
+from src.database.models import Base, Role, User
+from src.services import auth_service
+from src.web import auth
+
+
+async def scenario(url: str):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        session.add(User(username='alice', password_hash='x', is_active=True,
+                         roles=[Role(name='viewer', permissions='search')]))
+        await session.commit()
+
+    token = auth.create_access_token({'sub': 'alice'})
+    seen = []
+    try:
+        async with AsyncSession(engine) as session:
+            seen.append(await auth.get_current_user(token, session))
+
+        async with AsyncSession(engine) as session:
+            role = (await session.execute(select(Role).where(Role.name == 'viewer'))).scalar_one()
+            role.permissions = 'search,view_metrics'
+            await session.commit()
+
+        async with AsyncSession(engine) as session:
+            seen.append(await auth.get_current_user(token, session))
+
+        async with AsyncSession(engine) as session:
+            user = (await session.execute(
+                select(User).options(selectinload(User.roles)).where(User.username == 'alice')
+            )).scalar_one()
+            user.roles.clear()
+            await session.commit()
+
+        async with AsyncSession(engine) as session:
+            seen.append(await auth.get_current_user(token, session))
+    finally:
+        await engine.dispose()
+    return seen
+
+
+def test_web_auth_shares_the_service_principal_cache():
+    assert auth.load_principal is auth_service.load_principal
+
+
+def test_committed_permission_changes_reach_the_next_request(tmp_path):
+    auth_service.principal_cache.invalidate()
+    before, granted, revoked = asyncio.run(
+        scenario(f"sqlite+aiosqlite:///{os.path.join(tmp_path, 'auth.db')}")
+    )
+    assert not before.has_permission('view_metrics')
+    assert granted.has_permission('view_metrics')
+    assert not revoked.has_permission('search')
@@ -0,0 +1,83 @@
+"""The pandas mask and the SQL clause select the same rows for a query."""
+import asyncio
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from src.database.models import Base, Product
+from src.services import product_service
+from src.utils import data_manager
+from src.utils.query_language import compile_mask, compile_sql, parse_query
+
+# Workbook rows with mixed-case values and empty cells
+ROWS = [
+    {'IMEI': '1', 'Model': 'iPhone 13', 'RAM': '4GB', 'Storage': '128GB', 'Network': '5G',
+     'Condition': 'Used', 'Status': 'in_stock', 'Price': 500.0, 'Shop_ID': 1},
+    {'IMEI': '2', 'Model': 'OnePlus 9', 'RAM': None, 'Storage': '256gb', 'Network': None,
+     'Condition': 'new', 'Status': 'sold', 'Price': 400.0, 'Shop_ID': 2},
+    {'IMEI': '3', 'Model': 'Galaxy S21', 'RAM': '24GB', 'Storage': None, 'Network': '4G',
+     'Condition': None, 'Status': 'in_stock', 'Price': 350.0, 'Shop_ID': 1},
+    {'IMEI': '4', 'Model': 'Pixel 7 100%', 'RAM': '8gb', 'Storage': '128gb', 'Network': '5g',
+     'Condition': 'nEW', 'Status': 'returned', 'Price': 300.0, 'Shop_ID': 3},
+]
+
+QUERIES = [
+    'ram:4gb', '-ram:4gb', 'ram:nan', '-storage:nan',
+    'condition:new', 'condition:NEW', '-condition:used',
+    'network:5g', '-network:5g',
+    'model:iphone', 'model:ONEPLUS', '-model:one', 'model:%', 'model:_',
+    'storage:128gb or ram:8gb', '-(ram:4gb or network:4g)',
+    'not (condition:new and storage:256gb)', 'status:in_stock -ram:24gb',
+    'price:<450', '-price:>=400', 'shop:1', '-shop:1 condition:new',
+    'brand:apple', '-brand:apple',
+]
+
+
+def pandas_imeis(df: pd.DataFrame, query: str) -> list:
+    mask = compile_mask(parse_query(query), df, data_manager.QUERY_COLUMNS,
+                        lambda text: np.zeros(len(df), dtype=bool))
+    return sorted(df['IMEI'][mask])
+
+
+async def sql_imeis(url: str) -> dict:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with AsyncSession(engine) as session:
+            session.add_all(
+                Product(imei=row['IMEI'], model=row['Model'], ram=row['RAM'], storage=row['Storage'],
+                        network=row['Network'], condition=row['Condition'], status=row['Status'],
+                        price=row['Price'], shop_id=row['Shop_ID'])
+                for row in ROWS
+            )
+            await session.commit()
+            found = {}
+            for query in QUERIES:
+                clause = compile_sql(parse_query(query), product_service.QUERY_COLUMNS,
+                                     lambda text: Product.id.is_(None))
+                result = await session.execute(select(Product.imei).where(clause))
+                found[query] = sorted(result.scalars())
+            return found
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope='module')
+def sql_results(tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp('query'), 'query.db')
+    return asyncio.run(sql_imeis(f"sqlite+aiosqlite:///{path}"))
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_sql_matches_pandas(sql_results, query):
+    df = pd.DataFrame(ROWS).fillna(np.nan)
+    assert sql_results[query] == pandas_imeis(df, query)
+
+
+def test_empty_cells_are_not_the_text_nan():
+    df = pd.DataFrame(ROWS).fillna(np.nan)
+    assert pandas_imeis(df, 'ram:nan') == []
+    assert pandas_imeis(df, '-ram:4gb') == ['2', '3', '4']
@@ -0,0 +1,115 @@
+"""EXPLAIN QUERY PLAN regression check for the service queries.
+
+Runs each service query against a scratch SQLite database built from the
+models (indexes and FTS table included), captures the SQL it emits and fails
+if any plan falls back to a full table scan not listed in EXPECTED_SCANS.
+
+Usage: python -m pytest tests/test_query_plans.py
+"""
+import asyncio
+import os
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from src.database.models import Base, Product, Shop
+from src.database.fts import create_fts
+from src.services.auth_service import AuthService
+from src.services.product_service import ProductService
+
+# Service queries and the call that issues them
+QUERIES = {
+    'auth.authenticate_user': lambda s: AuthService(s).authenticate_user('nobody', 'x'),
+    'products.list': lambda s: ProductService(s).list_products(100, 50, ['imei', 'model']),
+    'products.search (fts)': lambda s: ProductService(s).search_products('iphone'),
+    'products.query shop+status': lambda s: ProductService(s).search_products('shop:2 status:sold'),
+    'products.query condition+status': lambda s: ProductService(s).search_products('condition:used status:in_stock'),
+    'products.query condition': lambda s: ProductService(s).search_products('condition:Used'),
+    'products.query status+price': lambda s: ProductService(s).search_products('status:in_stock price:<300'),
+    'products.query text+status': lambda s: ProductService(s).search_products('"model 1" -status:sold'),
+}
+
+# Queries that read the whole table by design
+EXPECTED_SCANS = {
+    'products.all': lambda s: ProductService(s).get_all_products(),
+    'products.search (ilike)': lambda s: ProductService(s).search_products('13'),
+}
+
+
+def full_scans(plan) -> list:
+    """Plan rows that scan a table; virtual (FTS) table scans are index lookups"""
+    return [detail for detail in plan
+            if detail.startswith('SCAN ') and 'VIRTUAL TABLE' not in detail]
+
+
+async def create_database(url: str):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_fts)
+    async with AsyncSession(engine) as session:
+        session.add_all(Shop(id=i, name=f"Shop {i}") for i in range(1, 6))
+        session.add_all(
+            Product(
+                imei=str(i), model=f"Model {i % 50}", price=100 + i, shop_id=1 + i % 5,
+                condition=('new', 'used', 'refurbished')[i % 3],
+                status=('in_stock', 'sold', 'returned', 'missing')[i % 4]
+            )
+            for i in range(500)
+        )
+        await session.commit()
+    async with engine.begin() as conn:
+        await conn.execute(text('ANALYZE'))
+    return engine
+
+
+async def explain(engine, call) -> list:
+    """Run `call` and return (sql, plan rows) for every SELECT it issued"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    try:
+        async with AsyncSession(engine) as session:
+            await call(session)
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            if 'sqlite_master' in statement:
+                continue
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append((statement, [row[-1] for row in result]))
+    return plans
+
+
+@pytest.fixture(scope='module')
+def plans(tmp_path_factory):
+    """Query name -> [(sql, plan rows)] for every query above"""
+    url = f"sqlite+aiosqlite:///{os.path.join(tmp_path_factory.mktemp('plans'), 'plans.db')}"
+
+    async def collect():
+        engine = await create_database(url)
+        try:
+            return {name: await explain(engine, call)
+                    for name, call in {**QUERIES, **EXPECTED_SCANS}.items()}
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize('name', list(QUERIES))
+def test_query_uses_indexes(plans, name):
+    assert plans[name], f"{name} issued no SELECT"
+    for statement, plan in plans[name]:
+        assert not full_scans(plan), f"{' | '.join(plan)}\n{' '.join(statement.split())}"
+
+
+@pytest.mark.parametrize('name', list(EXPECTED_SCANS))
+def test_expected_scans_still_run(plans, name):
+    assert plans[name], f"{name} issued no SELECT"
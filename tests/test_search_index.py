@@ -0,0 +1,41 @@
+"""The search indexes skip empty cells instead of indexing them as 'nan'."""
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.search_index import InvertedIndex, TrigramIndex
+
+WORKBOOK = "Model,RAM,Network\niPhone 13,4GB,5G\n,,\nNano Phone,,4G\n"
+
+
+@pytest.fixture(params=['object', 'read'])
+def products(request) -> pd.DataFrame:
+    if request.param == 'object':
+        return pd.DataFrame({
+            'Model': ['iPhone 13', None, 'Nano Phone'],
+            'RAM': ['4GB', np.nan, None],
+            'Network': ['5G', np.nan, '4G'],
+        })
+    # Parsed like a workbook: string columns with NA (Arrow-backed under pandas 3)
+    return pd.read_csv(io.StringIO(WORKBOOK))
+
+
+def test_missing_values_are_not_indexed(products):
+    index = InvertedIndex(['Model', 'RAM', 'Network'])
+    index.build(products)
+
+    assert len(index) == 3
+    assert index.search('nan').tolist() == [2]
+    assert index.search('iphone 13').tolist() == [0]
+    assert index.search('4g').tolist() == [0, 2]
+    assert index.search('5g').tolist() == [0]
+
+
+def test_trigram_index_skips_missing_values(products):
+    index = TrigramIndex(['Model', 'RAM', 'Network'])
+    index.build(products)
+    index.add(3, {'Model': np.nan, 'RAM': '8GB'})
+
+    assert index.search('nan').tolist() == [2]
+    assert index.search('gb').tolist() == [0, 3]
+    assert index.search('4g').tolist() == [0, 2]